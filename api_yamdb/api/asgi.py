@@ -0,0 +1,179 @@
+"""ASGI application with a native path for anonymous catalogue reads."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest, get_script_name
+from django.core.signals import request_started
+from django.urls import Resolver404, resolve, set_script_prefix
+
+CATALOGUE_ROUTES = frozenset({
+    'api:titles-list',
+    'api:titles-detail',
+    'api:categories-list',
+    'api:genres-list',
+    'api:reviews-list',
+    'api:comments-list',
+})
+# Request headers which may change the response of a catalogue read.
+VARY_HEADERS = (b'host', b'accept', b'accept-language', b'if-none-match')
+
+
+def build_environ(scope, body=b''):
+    """WSGI environ of a request."""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin1'),
+        'PATH_INFO': scope['path'].encode().decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('ascii'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': BytesIO(),
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope['headers']:
+        name = name.decode('latin1').upper().replace('-', '_')
+        if name not in ('CONTENT_LENGTH', 'CONTENT_TYPE'):
+            name = f'HTTP_{name}'
+        value = value.decode('latin1')
+        if name in environ:
+            value = f'{environ[name]},{value}'
+        environ[name] = value
+    return environ
+
+
+async def read_body(receive):
+    """Body of the request, read from every `http.request` message."""
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        body.extend(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return bytes(body)
+
+
+def encode_headers(response):
+    headers = [(name.encode('latin1'), value.encode('latin1'))
+               for name, value in response.items()]
+    headers.extend(
+        (b'set-cookie', cookie.output(header='').strip().encode())
+        for cookie in response.cookies.values())
+    return headers
+
+
+class CatalogueApplication:
+    """
+    Answer anonymous GET and HEAD requests of the catalogue from a pool
+    of threads shared by the event loop, one request in flight per URL:
+    concurrent identical requests get the response of one view call.
+    Other requests run in the same pool without coalescing: asgiref's
+    WsgiToAsgi would run all of them in a single thread.
+    """
+
+    def __init__(self, handler, workers=None):
+        self.handler = handler
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers or settings.ASGI_READ_WORKERS,
+            thread_name_prefix='catalogue')
+        self.in_flight = {}
+
+    async def __call__(self, scope, receive, send):
+        if not self.is_catalogue_read(scope):
+            await self.fallback(scope, receive, send)
+            return
+        headers = dict(scope['headers'])
+        key = (scope['path'], scope['query_string'],
+               *(headers.get(name) for name in VARY_HEADERS))
+        future = self.in_flight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(
+                self.executor, self.get_response, scope)
+            self.in_flight[key] = future
+            future.add_done_callback(
+                lambda done: self.forget(key, done))
+        # A client which disconnects does not cancel the shared call.
+        status, response_headers, body = await asyncio.shield(future)
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': response_headers,
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': b'' if scope['method'] == 'HEAD' else body,
+        })
+
+    async def fallback(self, scope, receive, send):
+        if scope['type'] != 'http':
+            raise ValueError(f'Unsupported scope type {scope["type"]!r}')
+        body = await read_body(receive)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            self.executor, self.respond, scope, body, send, loop)
+
+    def respond(self, scope, body, send, loop):
+        """
+        Run the request and send the response from a thread of the pool.
+        A streaming response is read in that thread too, so its queries
+        use the database connection which started them.
+        """
+        def call(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        response = self.handle(scope, body)
+        try:
+            call({
+                'type': 'http.response.start',
+                'status': response.status_code,
+                'headers': encode_headers(response),
+            })
+            if scope['method'] != 'HEAD':
+                chunks = response if response.streaming else [
+                    response.content]
+                for chunk in chunks:
+                    call({'type': 'http.response.body', 'body': chunk,
+                          'more_body': True})
+            call({'type': 'http.response.body', 'body': b''})
+        finally:
+            response.close()
+
+    def forget(self, key, future):
+        if self.in_flight.get(key) is future:
+            del self.in_flight[key]
+
+    def is_catalogue_read(self, scope):
+        if (scope['type'] != 'http'
+                or scope['method'] not in ('GET', 'HEAD')
+                or any(name == b'authorization'
+                       for name, _ in scope['headers'])):
+            return False
+        try:
+            match = resolve(scope['path'])
+        except Resolver404:
+            return False
+        return match.view_name in CATALOGUE_ROUTES
+
+    def handle(self, scope, body=b''):
+        """Run the request through the middleware and the view."""
+        environ = build_environ(scope, body)
+        set_script_prefix(get_script_name(environ))
+        request_started.send(sender=self.__class__, environ=environ)
+        return self.handler.get_response(WSGIRequest(environ))
+
+    def get_response(self, scope):
+        response = self.handle(scope)
+        try:
+            return (response.status_code, encode_headers(response),
+                    response.content)
+        finally:
+            # Sends request_finished like the WSGI server does.
+            response.close()
@@ -0,0 +1,72 @@
+"""JWT authentication which takes the user from the token claims."""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from reviews.models import User
+
+VERSION_CLAIM = 'token_version'
+# Cached version of a deleted or inactive user, never equal to a claim.
+REVOKED = -1
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry the role of the user."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for name in User.TOKEN_CLAIMS:
+            token[name] = getattr(user, name)
+        token[VERSION_CLAIM] = user.token_version
+        return token
+
+
+class ClaimsUser(TokenUser):
+    """User built from the claims of a validated token."""
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+
+def version_key(user_id):
+    return f'token-version:{user_id}'
+
+
+def get_token_version(user_id):
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(pk=user_id, is_active=True).values_list(
+            'token_version', flat=True).first()
+        if version is None:
+            version = REVOKED
+        cache.set(key, version, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def forget_token_version(user_id):
+    cache.delete(version_key(user_id))
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Authenticate tokens issued by ClaimsRefreshToken without loading the user.
+    Only the token version is compared, mostly from the cache, so changing
+    the role, deactivating or deleting the user revokes its tokens.
+    Tokens without the claims fall back to loading the user.
+    """
+
+    def get_user(self, validated_token):
+        if VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        user = ClaimsUser(validated_token)
+        if get_token_version(user.pk) != validated_token[VERSION_CLAIM]:
+            raise AuthenticationFailed(
+                'Token has been revoked', code='token_revoked')
+        return user
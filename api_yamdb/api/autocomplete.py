@@ -0,0 +1,164 @@
+"""In-memory prefix index of title names for search suggestions."""
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from reviews.models import Title
+from . import cache
+
+CACHE_PREFIX = 'titles-autocomplete'
+# Bumped on every deletion of titles, which leaves no row to be found
+# by date.
+DELETED_PREFIX = 'titles-deleted'
+# Titles updated this long before the last sync are read again, so rows
+# of transactions which were still open then are not missed.
+CATCH_UP_OVERLAP = timedelta(seconds=10)
+
+
+def normalize(name):
+    """Case and whitespace insensitive form of a name."""
+    return ' '.join(name.casefold().split())
+
+
+class TitlePrefixIndex:
+    """
+    Titles sorted by normalized name, so the titles starting with
+    a prefix are a slice found with bisect.
+    The index is loaded on the first search and kept up to date with
+    changes committed by this process. Changes of other processes bump
+    a version in the cache when it is shared between processes, and
+    the index is checked at least every AUTOCOMPLETE_MAX_AGE seconds
+    otherwise. A check reads only the titles whose `updated` is newer
+    than the last one; it reloads everything after deletions, which
+    are counted in the cache.
+    The database is read outside the lock of the entries, so searches
+    keep using the current ones until the new ones are swapped in.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Held by the thread which reads changes from the database.
+        self.refreshing = threading.Lock()
+        self.entries = None
+        self.titles = {}
+        self.version = None
+        self.deleted = None
+        # Database time the index is up to date with and the monotonic
+        # time of that check.
+        self.synced = None
+        self.checked = None
+
+    def load(self, version, deleted):
+        synced = timezone.now()
+        titles = {
+            pk: (name, year) for pk, name, year in
+            Title.objects.values_list('id', 'name', 'year').iterator(
+                chunk_size=settings.EXPORT_CHUNK_SIZE)}
+        entries = sorted(
+            (normalize(name), pk) for pk, (name, _) in titles.items())
+        with self.lock:
+            # Changes applied meanwhile bumped the versions, so the next
+            # search catches up with them.
+            self.titles = titles
+            self.entries = entries
+            self.deleted = deleted
+            self.mark_synced(version, synced)
+
+    def catch_up(self, version):
+        """Index the titles changed since the last check."""
+        synced = timezone.now()
+        changed = list(Title.objects.filter(
+            updated__gte=self.synced - CATCH_UP_OVERLAP).values_list(
+            'id', 'name', 'year'))
+        with self.lock:
+            for pk, name, year in changed:
+                self.put(pk, name, year)
+            self.mark_synced(version, synced)
+
+    def refresh(self, version, deleted):
+        # One thread reads the database, the others keep searching
+        # the current entries unless there are none yet.
+        if not self.refreshing.acquire(blocking=self.entries is None):
+            return
+        try:
+            if self.entries is None or self.deleted != deleted:
+                self.load(version, deleted)
+            elif self.is_stale(version):
+                self.catch_up(version)
+        finally:
+            self.refreshing.release()
+
+    def mark_synced(self, version, synced):
+        self.version = version
+        self.synced = synced
+        self.checked = time.monotonic()
+
+    def is_stale(self, version):
+        return (self.version != version
+                or time.monotonic() - self.checked
+                >= settings.AUTOCOMPLETE_MAX_AGE)
+
+    def search(self, query, limit):
+        """Id, name and year of the first titles starting with the query."""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        version = cache.get_version(CACHE_PREFIX)
+        deleted = cache.get_version(DELETED_PREFIX)
+        if (self.entries is None or self.deleted != deleted
+                or self.is_stale(version)):
+            self.refresh(version, deleted)
+        with self.lock:
+            matches = []
+            start = bisect_left(self.entries, (prefix,))
+            for key, pk in self.entries[start:start + limit]:
+                if not key.startswith(prefix):
+                    break
+                name, year = self.titles[pk]
+                matches.append({'id': pk, 'name': name, 'year': year})
+            return matches
+
+    def put(self, pk, name, year):
+        self.discard(pk)
+        self.titles[pk] = (name, year)
+        insort(self.entries, (normalize(name), pk))
+
+    def discard(self, pk):
+        if pk in self.titles:
+            name, _ = self.titles.pop(pk)
+            del self.entries[bisect_left(self.entries, (normalize(name), pk))]
+
+    def add_titles(self, titles):
+        """Index new or changed titles given as (id, name, year)."""
+        def change():
+            for pk, name, year in titles:
+                self.put(pk, name, year)
+        self.apply(change)
+
+    def remove_titles(self, title_ids):
+        def change():
+            for pk in title_ids:
+                self.discard(pk)
+        self.apply(change, deletes=True)
+
+    def apply(self, change, deletes=False):
+        with self.lock:
+            version = cache.invalidate(CACHE_PREFIX)
+            if deletes:
+                deleted = cache.invalidate(DELETED_PREFIX)
+            if self.entries is None:
+                return
+            change()
+            # Otherwise another process has changed titles as well,
+            # the next search catches up with them.
+            if version == self.version + 1:
+                self.version = version
+            if deletes and deleted == self.deleted + 1:
+                self.deleted = deleted
+
+
+index = TitlePrefixIndex()
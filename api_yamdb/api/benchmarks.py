@@ -0,0 +1,146 @@
+"""Timed scenarios of the main endpoints for the `benchmark` command."""
+from itertools import count
+
+from django.contrib.auth.tokens import default_token_generator
+from django.db.models import Count, Max
+from rest_framework.test import APIClient
+
+from reviews.models import Comment, Genre, Review, Title, User
+from .authentication import ClaimsRefreshToken
+
+SCENARIOS = {}
+
+
+def scenario(name, writes=False, status=200):
+    """
+    Register a scenario. It gets the benchmark context and returns
+    a callable which makes one request and returns the response,
+    which must have the given status.
+    Scenarios that write are run in a transaction that is rolled back.
+    """
+    def register(func):
+        SCENARIOS[name] = (func, writes, status)
+        return func
+    return register
+
+
+class BenchmarkContext:
+    """Objects of the current database the scenarios send requests about."""
+
+    def __init__(self):
+        self.client = APIClient()
+        self.popular_title = Title.objects.order_by('-review_count').first()
+        self.review = (Review.objects.filter(pk=Comment.objects.values(
+            'review_id').order_by('review_id')[:1]).first()
+            or Review.objects.order_by('id').first())
+        self.genre = Genre.objects.order_by('id').first()
+        self.popular_genres = list(
+            Genre.objects.annotate(titles=Count('title'))
+            .order_by('-titles', 'id').values_list('slug', flat=True)[:2])
+        self.year = Title.objects.aggregate(year=Max('year'))['year']
+        # The most reviewed title that some user has not reviewed yet.
+        self.review_title = (
+            Title.objects.filter(review_count__lt=User.objects.count())
+            .order_by('-review_count').first())
+        self.author = (
+            User.objects.exclude(reviews__title=self.review_title)
+            .order_by('id').first())
+
+    def auth_client(self, user):
+        client = APIClient()
+        token = ClaimsRefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+
+@scenario('title_list')
+def title_list(context):
+    return lambda: context.client.get('/api/v1/titles/')
+
+
+@scenario('title_list_large_page')
+def title_list_large_page(context):
+    return lambda: context.client.get('/api/v1/titles/?limit=500')
+
+
+@scenario('title_list_filtered')
+def title_list_filtered(context):
+    url = (f'/api/v1/titles/?genre={context.genre.slug}'
+           f'&year={context.year}&limit=20')
+    return lambda: context.client.get(url)
+
+
+@scenario('title_list_genres_all')
+def title_list_genres_all(context):
+    url = (f'/api/v1/titles/?genre={",".join(context.popular_genres)}'
+           f'&genre_mode=all&year_min={context.year - 30}&limit=20')
+    return lambda: context.client.get(url)
+
+
+@scenario('title_top_genre')
+def title_top_genre(context):
+    url = f'/api/v1/titles/top/?genre={context.genre.slug}&limit=100'
+    return lambda: context.client.get(url)
+
+
+@scenario('title_search')
+def title_search(context):
+    name = context.popular_title.name.split()[0]
+    return lambda: context.client.get(f'/api/v1/titles/?search={name}')
+
+
+@scenario('review_list')
+def review_list(context):
+    url = f'/api/v1/titles/{context.popular_title.id}/reviews/'
+    return lambda: context.client.get(url)
+
+
+@scenario('review_list_large_page')
+def review_list_large_page(context):
+    url = f'/api/v1/titles/{context.popular_title.id}/reviews/?limit=500'
+    return lambda: context.client.get(url)
+
+
+@scenario('review_list_deep_offset')
+def review_list_deep_offset(context):
+    title = context.popular_title
+    offset = max(title.review_count - 10, 0)
+    url = f'/api/v1/titles/{title.id}/reviews/?offset={offset}'
+    return lambda: context.client.get(url)
+
+
+@scenario('comment_list')
+def comment_list(context):
+    review = context.review
+    url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+    return lambda: context.client.get(url)
+
+
+@scenario('signup_token', writes=True)
+def signup_token(context):
+    numbers = count()
+
+    def run():
+        # A new identity and address on every run, so the requests
+        # stay under the rate limits of the authentication endpoints.
+        number = next(numbers)
+        address = f'10.{number >> 16 & 255}.{number >> 8 & 255}.{number & 255}'
+        data = {'username': f'benchmark_user_{number}',
+                'email': f'benchmark_{number}@yamdb.fake'}
+        response = context.client.post(
+            '/api/v1/auth/signup/', data=data, REMOTE_ADDR=address)
+        if response.status_code != 200:
+            return response
+        user = User.objects.get(username=data['username'])
+        return context.client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        }, REMOTE_ADDR=address)
+    return run
+
+
+@scenario('review_create', writes=True, status=201)
+def review_create(context):
+    client = context.auth_client(context.author)
+    url = f'/api/v1/titles/{context.review_title.id}/reviews/'
+    return lambda: client.post(url, data={'text': 'Benchmark', 'score': 7})
@@ -0,0 +1,49 @@
+"""Versioned response cache of small list endpoints."""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import urlencode
+
+
+def version_key(prefix):
+    return f'list-cache:{prefix}:version'
+
+
+def new_version():
+    # A version evicted from the cache must not be reused, otherwise
+    # pages cached before the eviction would become fresh again.
+    return time.time_ns()
+
+
+def get_version(prefix):
+    version = cache.get(version_key(prefix))
+    if version is None:
+        cache.add(version_key(prefix), new_version(), None)
+        version = cache.get(version_key(prefix))
+    return version
+
+
+def list_cache_key(prefix, request):
+    params = sorted(request.query_params.lists())
+    return (f'list-cache:{prefix}:{get_version(prefix)}:'
+            f'{request.get_host()}:{urlencode(params, doseq=True)}')
+
+
+def get_list(prefix, request):
+    return cache.get(list_cache_key(prefix, request))
+
+
+def set_list(prefix, request, data):
+    cache.set(list_cache_key(prefix, request), data,
+              settings.LIST_CACHE_TIMEOUT)
+
+
+def invalidate(prefix):
+    """Make every cached page of the list stale at once."""
+    try:
+        return cache.incr(version_key(prefix))
+    except ValueError:
+        version = new_version()
+        cache.set(version_key(prefix), version, None)
+        return version
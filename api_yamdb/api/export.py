@@ -0,0 +1,143 @@
+"""Streaming export of titles, reviews and comments as NDJSON or CSV."""
+import csv
+import json
+from datetime import datetime, time
+from itertools import islice
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from reviews.models import Comment, Review, Title
+from .mixins import format_datetime
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def parse_updated_since(value):
+    """Datetime or date of the `updated_since` filter, naive as UTC."""
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is not None:
+                moment = datetime.combine(day, time())
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ValueError(f'Invalid date: {value}')
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, timezone.utc)
+    return moment
+
+
+class Export:
+    """Rows of one model read with a server side iterator."""
+
+    model = None
+    fields = ()
+    columns = ()
+
+    def __init__(self, updated_since=None):
+        self.updated_since = updated_since
+
+    def get_queryset(self):
+        queryset = self.model.objects.order_by('id')
+        if self.updated_since is not None:
+            queryset = queryset.filter(updated__gte=self.updated_since)
+        return queryset.values_list(*self.fields)
+
+    def build_rows(self, rows):
+        raise NotImplementedError('.build_rows() must be overridden')
+
+    def __iter__(self):
+        rows = self.get_queryset().iterator(
+            chunk_size=settings.EXPORT_CHUNK_SIZE)
+        while True:
+            chunk = list(islice(rows, settings.EXPORT_CHUNK_SIZE))
+            if not chunk:
+                return
+            yield from self.build_rows(chunk)
+
+
+class TitleExport(Export):
+    model = Title
+    fields = ('id', 'name', 'year', 'description', 'category__slug',
+              'rating', 'review_count', 'updated')
+    columns = ('id', 'name', 'year', 'description', 'category', 'genre',
+               'rating', 'review_count', 'updated')
+
+    def build_rows(self, rows):
+        genres = {row[0]: [] for row in rows}
+        links = Title.genre.through.objects.filter(
+            title_id__in=genres).order_by('genre_id').values_list(
+            'title_id', 'genre__slug')
+        for title_id, slug in links:
+            genres[title_id].append(slug)
+        for (pk, name, year, description, category, rating, review_count,
+             updated) in rows:
+            yield {
+                'id': pk, 'name': name, 'year': year,
+                'description': description, 'category': category,
+                'genre': genres[pk],
+                'rating': rating,
+                'review_count': review_count,
+                'updated': format_datetime(updated),
+            }
+
+
+class ReviewExport(Export):
+    model = Review
+    fields = ('id', 'title_id', 'author__username', 'text', 'score',
+              'comment_count', 'pub_date', 'updated')
+    columns = ('id', 'title_id', 'author', 'text', 'score', 'comment_count',
+               'pub_date', 'updated')
+
+    def build_rows(self, rows):
+        for row in rows:
+            row = dict(zip(self.columns, row))
+            row['pub_date'] = format_datetime(row['pub_date'])
+            row['updated'] = format_datetime(row['updated'])
+            yield row
+
+
+class CommentExport(ReviewExport):
+    model = Comment
+    fields = ('id', 'review__title_id', 'review_id', 'author__username',
+              'text', 'pub_date', 'updated')
+    columns = ('id', 'title_id', 'review_id', 'author', 'text', 'pub_date',
+               'updated')
+
+
+EXPORTS = {
+    'titles': TitleExport,
+    'reviews': ReviewExport,
+    'comments': CommentExport,
+}
+
+
+class Echo:
+    """File-like object which returns what is written to it."""
+
+    def write(self, value):
+        return value
+
+
+def render_ndjson(export):
+    for row in export:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def render_csv(export):
+    writer = csv.writer(Echo())
+    yield writer.writerow(export.columns)
+    for row in export:
+        yield writer.writerow(
+            ','.join(value) if isinstance(value, list) else value
+            for value in row.values())
+
+
+RENDERERS = {'ndjson': render_ndjson, 'csv': render_csv}
@@ -1,17 +1,77 @@
 import django_filters
+from django.db.models import Count
 from django_filters.rest_framework import FilterSet
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
 
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(FilterSet):
     """Filters the list of works."""
 
-    genre = django_filters.CharFilter(lookup_expr='slug')
+    genre = django_filters.CharFilter(method='filter_genre')
+    genre_mode = django_filters.ChoiceFilter(
+        choices=(('any', 'any'), ('all', 'all')), method='filter_genre_mode')
     category = django_filters.CharFilter(lookup_expr="slug")
     name = django_filters.CharFilter(lookup_expr="contains")
     year = django_filters.NumberFilter()
+    year_min = django_filters.NumberFilter(
+        field_name='year', lookup_expr='gte')
+    year_max = django_filters.NumberFilter(
+        field_name='year', lookup_expr='lte')
 
     class Meta:
         model = Title
         fields = ['name', 'year', 'genre', 'category']
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Titles of any or all of the comma separated genre slugs.
+        They are selected with one semi-join on the link table, grouped
+        by title when all genres are required, so no join multiplies
+        the rows and no distinct() is needed.
+        """
+        slugs = {slug.strip() for slug in value.split(',') if slug.strip()}
+        links = Title.genre.through.objects.filter(
+            genre__slug__in=slugs).order_by().values('title_id')
+        if self.form.cleaned_data.get('genre_mode') == 'all':
+            # An unknown slug leaves no title with all the genres.
+            links = links.annotate(genres=Count('genre_id')).filter(
+                genres=len(slugs)).values('title_id')
+        return queryset.filter(pk__in=links)
+
+    def filter_genre_mode(self, queryset, name, value):
+        # Read by filter_genre.
+        return queryset
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """Full-text search of works ordered by relevance."""
+
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        cursor_param = getattr(view.paginator, 'cursor_query_param', None)
+        if query.split() and cursor_param in request.query_params:
+            # Cursor pages are ordered by id, which would drop the rank.
+            raise ValidationError({cursor_param: [
+                'Search results are ordered by relevance and are paged '
+                'with limit and offset.']})
+        return search_titles(queryset, query)
+
+
+class IdTieOrderingFilter(OrderingFilter):
+    """
+    Ordering by the query parameter with ties broken by id in the
+    direction of the last field, which matches the counter indexes
+    and keeps pages stable.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering or ordering[-1].lstrip('-') in ('id', 'pk'):
+            return ordering
+        return [*ordering, '-id' if ordering[-1].startswith('-') else 'id']
@@ -0,0 +1,106 @@
+"""Concurrent catalogue reads sent to an ASGI application in process."""
+import asyncio
+import random
+import statistics
+import time
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+PAGE_SIZE = 20
+
+
+def catalogue_paths(titles=100):
+    """Anonymous catalogue reads spread over the most reviewed titles."""
+    paths = ['/api/v1/categories/', '/api/v1/genres/']
+    paths.extend(
+        f'/api/v1/titles/?limit={PAGE_SIZE}&offset={offset}'
+        for offset in range(0, Title.objects.count(), PAGE_SIZE))
+    title_ids = Title.objects.order_by('-review_count').values_list(
+        'id', flat=True)[:titles]
+    for title_id in title_ids:
+        paths.append(f'/api/v1/titles/{title_id}/')
+        paths.append(f'/api/v1/titles/{title_id}/reviews/')
+    reviews = Review.objects.filter(
+        pk__in=Comment.objects.values('review_id'),
+        title_id__in=list(title_ids)).values_list('title_id', 'id')[:titles]
+    paths.extend(f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+                 for title_id, review_id in reviews)
+    if Category.objects.exists() and Genre.objects.exists():
+        return paths
+    return paths[2:]
+
+
+def request_paths(paths, requests, skew=1.0, seed=0):
+    """
+    Paths of the requests in order. With a positive skew the popularity
+    follows a Zipf distribution like the data of `generate_data`, so
+    the first pages and the most reviewed titles are read most.
+    """
+    weights = [1 / rank ** skew for rank in range(1, len(paths) + 1)]
+    return random.Random(seed).choices(paths, weights, k=requests)
+
+
+def http_scope(path):
+    path, _, query = path.partition('?')
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'root_path': '',
+        'query_string': query.encode(),
+        'headers': [(b'host', b'testserver'),
+                    (b'accept', b'application/json')],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+
+
+async def request(application, path):
+    """Status and body of one request."""
+    response = {'body': b''}
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        else:
+            response['body'] += message.get('body', b'')
+
+    await application(http_scope(path), receive, send)
+    return response['status'], response['body']
+
+
+async def run_load(application, paths, connections):
+    """Send the paths in turn from concurrent connections."""
+    requests = len(paths)
+    latencies = []
+    errors = 0
+
+    async def connection(number):
+        nonlocal errors
+        for index in range(number, requests, connections):
+            started = time.perf_counter()
+            status, _ = await request(application, paths[index])
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connection(number)
+                           for number in range(connections)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': requests,
+        'errors': errors,
+        'seconds': elapsed,
+        'requests_per_second': requests / elapsed,
+        'median_ms': statistics.median(latencies) * 1000,
+        'p95_ms': latencies[min(len(latencies) - 1,
+                                int(len(latencies) * 0.95))] * 1000,
+    }
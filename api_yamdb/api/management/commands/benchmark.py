@@ -0,0 +1,119 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+from django.db import connection, transaction
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.benchmarks import SCENARIOS, BenchmarkContext
+from reviews.models import Comment, Review, Title, User
+
+
+class Rollback(Exception):
+    pass
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Times the main endpoints through the Django test client.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scenarios', nargs='*',
+            help=f'Scenarios to run: {", ".join(SCENARIOS)}. All by default.')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--output', help='File to write the results to.')
+        parser.add_argument(
+            '--compare', help='Results of an earlier run to compare with.')
+
+    def handle(self, *args, **options):
+        names = options['scenarios'] or list(SCENARIOS)
+        unknown = set(names) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f'Unknown scenarios: {", ".join(unknown)}')
+        if not Title.objects.exists():
+            raise CommandError('The database is empty, run generate_data.')
+        context = BenchmarkContext()
+        results = {
+            'commit': current_commit(),
+            'created': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'database': {
+                model._meta.db_table: model.objects.count()
+                for model in (User, Title, Review, Comment)
+            },
+            'scenarios': {},
+        }
+        for name in names:
+            func, writes, status = SCENARIOS[name]
+            result = self.run_scenario(
+                name, func(context), writes, status, options['repeat'],
+                options['warmup'])
+            results['scenarios'][name] = result
+            self.stdout.write(
+                f'{name:<26} median {result["median_ms"]:9.2f} ms  '
+                f'p95 {result["p95_ms"]:9.2f} ms  '
+                f'{result["queries"]} queries  status {result["status"]}')
+        if options['compare']:
+            self.compare(results, options['compare'])
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(results, file, indent=2)
+
+    def run_scenario(self, name, request, writes, status, repeat, warmup):
+        timings = []
+        for iteration in range(warmup + repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = self.call(request, writes)
+                elapsed = time.perf_counter() - started
+            # Timings of error responses would not measure the endpoint.
+            if response.status_code != status:
+                raise CommandError(
+                    f'{name} returned status {response.status_code} '
+                    f'instead of {status} on run {iteration + 1}.')
+            if iteration >= warmup:
+                timings.append(elapsed * 1000)
+        timings.sort()
+        return {
+            'runs': repeat,
+            'status': response.status_code,
+            'queries': len(queries.captured_queries),
+            'min_ms': timings[0],
+            'median_ms': statistics.median(timings),
+            'p95_ms': timings[min(len(timings) - 1,
+                                  int(len(timings) * 0.95))],
+            'mean_ms': statistics.mean(timings),
+        }
+
+    def call(self, request, writes):
+        if not writes:
+            return request()
+        try:
+            with transaction.atomic():
+                response = request()
+                raise Rollback
+        except Rollback:
+            return response
+
+    def compare(self, results, path):
+        with open(path) as file:
+            previous = json.load(file)['scenarios']
+        for name, result in results['scenarios'].items():
+            if name not in previous:
+                continue
+            change = result['median_ms'] / previous[name]['median_ms'] - 1
+            self.stdout.write(f'{name:<26} median {change:+.1%}')
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.export import EXPORTS, RENDERERS, parse_updated_since
+
+
+class Command(BaseCommand):
+    help = 'Writes titles, reviews or comments as NDJSON or CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=EXPORTS)
+        parser.add_argument('--format', choices=RENDERERS, default='ndjson')
+        parser.add_argument(
+            '--updated-since',
+            help='Only rows changed since this date or datetime.')
+        parser.add_argument(
+            '--output', help='File to write to, stdout by default.')
+
+    def handle(self, *args, **options):
+        updated_since = options['updated_since']
+        if updated_since is not None:
+            try:
+                updated_since = parse_updated_since(updated_since)
+            except ValueError as error:
+                raise CommandError(error)
+        export = EXPORTS[options['resource']](updated_since)
+        lines = RENDERERS[options['format']](export)
+        if options['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as file:
+            file.writelines(lines)
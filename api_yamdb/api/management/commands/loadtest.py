@@ -0,0 +1,51 @@
+import asyncio
+
+from asgiref.wsgi import WsgiToAsgi
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+
+from api.asgi import CatalogueApplication
+from api.loadtest import catalogue_paths, request_paths, run_load
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = ('Compares the throughput of concurrent catalogue reads served '
+            'by the WSGI handler and by the native ASGI path.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument(
+            '--skew', type=float, default=1.0,
+            help='Zipf exponent of the path popularity, 0 for uniform.')
+        parser.add_argument(
+            '--workers', type=int,
+            help='Threads of the ASGI path, ASGI_READ_WORKERS by default.')
+
+    def handle(self, *args, **options):
+        if not Title.objects.exists():
+            raise CommandError('The database is empty, run generate_data.')
+        paths = catalogue_paths()
+        requests = request_paths(
+            paths, options['requests'], options['skew'])
+        handler = get_wsgi_application()
+        applications = {
+            'wsgi': WsgiToAsgi(handler),
+            'asgi': CatalogueApplication(handler, options['workers']),
+        }
+        results = {}
+        for name, application in applications.items():
+            # Warm up connections, caches and imports.
+            asyncio.run(run_load(application, paths, 1))
+            result = asyncio.run(run_load(
+                application, requests, options['connections']))
+            results[name] = result
+            self.stdout.write(
+                f'{name}  {result["requests_per_second"]:8.1f} req/s  '
+                f'median {result["median_ms"]:8.2f} ms  '
+                f'p95 {result["p95_ms"]:8.2f} ms  '
+                f'errors {result["errors"]}')
+        ratio = (results['asgi']['requests_per_second']
+                 / results['wsgi']['requests_per_second'])
+        self.stdout.write(f'asgi/wsgi throughput {ratio:.2f}x')
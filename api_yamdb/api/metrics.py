@@ -0,0 +1,122 @@
+"""In-process registry of per-route request metrics."""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+current_sample = ContextVar('current_sample', default=None)
+
+
+class RequestSample:
+    """Measurements collected while one request is handled."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.timing = False
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += time.perf_counter() - started
+
+
+@contextmanager
+def serializer_timer():
+    """Add the time of the block to the serializer time of the request."""
+    sample = current_sample.get()
+    if sample is None or sample.timing:
+        yield
+        return
+    sample.timing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        sample.serializer_time += time.perf_counter() - started
+        sample.timing = False
+
+
+class RouteMetrics:
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = defaultdict(RouteMetrics)
+
+    def observe(self, route, sample, latency):
+        with self.lock:
+            metrics = self.routes[route]
+            metrics.requests += 1
+            metrics.queries += sample.queries
+            metrics.sql_time += sample.sql_time
+            metrics.serializer_time += sample.serializer_time
+            metrics.latency_sum += latency
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    metrics.latency_buckets[index] += 1
+
+    def clear(self):
+        with self.lock:
+            self.routes.clear()
+
+    def render_prometheus(self):
+        """Dump the metrics in the Prometheus text exposition format."""
+        with self.lock:
+            routes = sorted(
+                (route, vars(metrics).copy())
+                for route, metrics in self.routes.items())
+        lines = []
+        counters = (
+            ('requests_total', 'requests', 'Handled requests.'),
+            ('db_queries_total', 'queries', 'Executed SQL queries.'),
+            ('db_query_seconds_total', 'sql_time',
+             'Time spent in SQL queries.'),
+            ('serializer_seconds_total', 'serializer_time',
+             'Time spent building response data.'),
+        )
+        for name, attr, help_text in counters:
+            lines.append(f'# HELP yamdb_{name} {help_text}')
+            lines.append(f'# TYPE yamdb_{name} counter')
+            for route, metrics in routes:
+                lines.append(
+                    f'yamdb_{name}{{route="{escape(route)}"}} '
+                    f'{metrics[attr]}')
+        name = 'yamdb_request_duration_seconds'
+        lines.append(f'# HELP {name} Request latency.')
+        lines.append(f'# TYPE {name} histogram')
+        for route, metrics in routes:
+            label = f'route="{escape(route)}"'
+            for bound, count in zip(LATENCY_BUCKETS,
+                                    metrics['latency_buckets']):
+                lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(
+                f'{name}_bucket{{{label},le="+Inf"}} {metrics["requests"]}')
+            lines.append(f'{name}_sum{{{label}}} {metrics["latency_sum"]}')
+            lines.append(f'{name}_count{{{label}}} {metrics["requests"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def escape(value):
+    return (value.replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+registry = MetricsRegistry()
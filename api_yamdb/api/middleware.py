@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from .metrics import RequestSample, current_sample, registry
+
+
+class RequestMetricsMiddleware:
+    """
+    Record query count, SQL time, serializer time and latency of every
+    request under its route name. In debug mode they are also returned
+    in the X-Query-Count and Server-Timing headers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample = RequestSample()
+        token = current_sample.set(sample)
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(sample.record_query):
+                response = self.get_response(request)
+        finally:
+            current_sample.reset(token)
+        latency = time.perf_counter() - started
+        registry.observe(self.route_name(request), sample, latency)
+        if settings.DEBUG:
+            response['X-Query-Count'] = sample.queries
+            response['Server-Timing'] = ', '.join(
+                f'{name};dur={duration * 1000:.2f}' for name, duration in (
+                    ('sql', sample.sql_time),
+                    ('serializer', sample.serializer_time),
+                    ('total', latency),
+                ))
+        return response
+
+    def route_name(self, request):
+        resolver_match = getattr(request, 'resolver_match', None)
+        if resolver_match is None:
+            return 'unresolved'
+        return resolver_match.view_name
@@ -1,4 +1,21 @@
-from rest_framework import mixins, viewsets
+from hashlib import md5
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import mixins, serializers, viewsets
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+from . import cache
+from .metrics import serializer_timer
+from .pagination import KeysetPagination, LimitOffsetOrCursorPagination
+from .renderers import FastJSONRenderer
+
+format_datetime = serializers.DateTimeField().to_representation
 
 
 class ListCreateDestroyViewSet(
@@ -6,3 +23,165 @@ class ListCreateDestroyViewSet(
     mixins.DestroyModelMixin, viewsets.GenericViewSet
 ):
     pass
+
+
+class CachedListMixin:
+    """Serve list pages from the cache until the model is changed."""
+
+    cache_prefix = None
+
+    def list(self, request, *args, **kwargs):
+        data = cache.get_list(self.cache_prefix, request)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        cache.set_list(self.cache_prefix, request, response.data)
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Add ETag and Last-Modified to list and detail responses.
+    The validators come from the `updated` column, so a matching
+    If-None-Match is answered with 304 before serialization.
+    If-Modified-Since is not evaluated: dates with one second precision
+    would hide changes made within that second and deletions from lists.
+    """
+
+    def get_etag(self, request, *parts):
+        key = ':'.join(str(part) for part in (
+            request.get_full_path(), request.accepted_media_type, *parts))
+        return quote_etag(md5(key.encode()).hexdigest())
+
+    def conditional_response(self, request, etag, last_modified, handler,
+                             *args, **kwargs):
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(
+                    last_modified.timestamp())
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if (isinstance(self.paginator, LimitOffsetOrCursorPagination)
+                and self.paginator.uses_cursor(request)):
+            parts, last_modified = self.get_page_validators(queryset)
+        else:
+            stats = queryset.aggregate(
+                count=Count('pk'), last_modified=Max('updated'))
+            parts = stats['count'], stats['last_modified']
+            last_modified = stats['last_modified']
+        etag = self.get_etag(request, *parts)
+        return self.conditional_response(
+            request, etag, last_modified, super().list, *args, **kwargs)
+
+    def get_page_validators(self, queryset):
+        """
+        Keys of the rows of a cursor page and its links. They only
+        depend on the page, which is found through the cursor index,
+        so a cursor page never counts the whole list.
+        """
+        ordering = KeysetPagination().get_ordering(
+            self.request, queryset, self)
+        rows = self.paginate_queryset(
+            queryset.prefetch_related(None).values(
+                'pk', 'updated', *(name.lstrip('-') for name in ordering)))
+        keys = [(row['pk'], row['updated']) for row in rows]
+        last_modified = max(
+            (updated for _, updated in keys), default=None)
+        return ((keys, self.paginator.get_paginated_response([]).data),
+                last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        last_modified = (
+            self.get_queryset().prefetch_related(None)
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .values_list('updated', flat=True).first()
+        )
+        if last_modified is None:
+            return super().retrieve(request, *args, **kwargs)
+        etag = self.get_etag(request, last_modified)
+        return self.conditional_response(
+            request, etag, last_modified, super().retrieve,
+            *args, **kwargs)
+
+
+class FastReadMixin:
+    """
+    Build GET responses from `.values()` rows instead of serializers.
+    `fast_fields` are loaded and `get_fast_data` turns a page of rows
+    into the dicts the serializer would build. Other renderers than
+    FastJSONRenderer, like the browsable API, get the serializer data.
+    """
+
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer)
+    fast_fields = ()
+
+    def get_fast_data(self, rows):
+        raise NotImplementedError('.get_fast_data() must be overridden')
+
+    def use_fast_path(self, request):
+        return (settings.FAST_READ_PATH
+                and isinstance(request.accepted_renderer, FastJSONRenderer))
+
+    def get_fast_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        # Selects added with extra(), like the search rank, may be used
+        # for ordering, so they are kept.
+        return queryset.values(*self.fast_fields, *queryset.query.extra)
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_path(request):
+            return super().list(request, *args, **kwargs)
+        rows = self.get_fast_queryset()
+        page = self.paginate_queryset(rows)
+        with serializer_timer():
+            data = self.get_fast_data(rows if page is None else page)
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.use_fast_path(request):
+            return super().retrieve(request, *args, **kwargs)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = self.get_fast_queryset().filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}).first()
+        if row is None:
+            raise Http404
+        self.check_object_permissions(request, row)
+        with serializer_timer():
+            data, = self.get_fast_data([row])
+        return Response(data)
+
+
+class NestedResourceMixin:
+    """
+    Load the parent object of a nested route once per request.
+    `parent_lookups` maps the url kwargs to the fields of `parent_model`,
+    all of them are checked in a single query.
+    """
+
+    parent_model = None
+    parent_lookups = {}
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(
+                self.parent_model.objects.all(),
+                **{field: self.kwargs.get(kwarg)
+                   for kwarg, field in self.parent_lookups.items()})
+        return self._parent
+
+
+class TimedSerializerMixin:
+    """Count the time spent building representations in request metrics."""
+
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
@@ -0,0 +1,147 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination ordered by the `ordering` parameter of the view's
+    ordering filter, or by its `cursor_ordering` without it.
+    The cursor holds the values of every ordering field, the last one
+    being unique, so a page starts right after the tuple of the previous
+    one instead of skipping rows which share the first value.
+    """
+
+    page_size_query_param = 'limit'
+
+    def get_ordering(self, request, queryset, view):
+        for backend in getattr(view, 'filter_backends', ()):
+            if issubclass(backend, OrderingFilter):
+                # IdTieOrderingFilter ends the ordering with id.
+                ordering = backend().get_ordering(request, queryset, view)
+                if ordering:
+                    return tuple(ordering)
+        ordering = view.cursor_ordering
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, position = 0, False, None
+        else:
+            offset, reverse, position = self.cursor
+        if reverse:
+            queryset = queryset.order_by(
+                *(name[1:] if name.startswith('-') else f'-{name}'
+                  for name in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_keyset_filter(queryset.model, position, reverse))
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+        following = None
+        if len(results) > len(self.page):
+            following = self._get_position_from_instance(
+                results[-1], self.ordering)
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None or offset > 0
+            self.has_previous = following is not None
+            self.next_position = position
+            self.previous_position = following
+        else:
+            self.has_next = following is not None
+            self.has_previous = position is not None or offset > 0
+            self.next_position = following
+            self.previous_position = position
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_keyset_filter(self, model, position, reverse):
+        """Rows following the position in the order of the page."""
+        try:
+            values = json.loads(position)
+            if len(values) != len(self.ordering):
+                raise ValueError
+            keys = []
+            for name, value in zip(self.ordering, values):
+                field = model._meta.get_field(name.lstrip('-'))
+                keys.append((
+                    field, field.to_python(value),
+                    'lt' if name.startswith('-') != reverse else 'gt'))
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        # (a, b) < (x, y) is written as a <= x AND (a < x OR b < y AND
+        # a = x), so the range on the first field can use the index.
+        condition = None
+        for field, value, lookup in reversed(keys):
+            after = self.get_field_filter(field, value, lookup)
+            if condition is not None:
+                # field=None is turned into IS NULL.
+                after |= Q(**{field.name: value}) & condition
+            condition = after
+        field, value, lookup = keys[0]
+        if len(keys) > 1 and not field.null:
+            condition &= Q(**{f'{field.name}__{lookup}e': value})
+        return condition
+
+    def get_field_filter(self, field, value, lookup):
+        """Values of the field past the value, NULL sorts first in SQLite."""
+        if value is None:
+            if lookup == 'gt':
+                return Q(**{f'{field.name}__isnull': False})
+            return Q(pk__in=[])
+        after = Q(**{f'{field.name}__{lookup}': value})
+        if field.null and lookup == 'lt':
+            after |= Q(**{f'{field.name}__isnull': True})
+        return after
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            values = [instance[name.lstrip('-')] for name in ordering]
+        else:
+            values = [getattr(instance, name.lstrip('-'))
+                      for name in ordering]
+        return json.dumps(
+            [None if value is None else str(value) for value in values])
+
+
+class LimitOffsetOrCursorPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination which switches to keyset pagination
+    when the `cursor` parameter is passed, even an empty one.
+    Cursor pages skip COUNT(*) and OFFSET, so deep pages stay cheap.
+    """
+
+    cursor_query_param = 'cursor'
+
+    def uses_cursor(self, request):
+        return self.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if not self.uses_cursor(request):
+            return super().paginate_queryset(queryset, request, view)
+        self.cursor_paginator = KeysetPagination()
+        self.cursor_paginator.cursor_query_param = self.cursor_query_param
+        return self.cursor_paginator.paginate_queryset(
+            queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
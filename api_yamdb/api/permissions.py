@@ -8,7 +8,7 @@ class IsAuthorOrReadOnly(BasePermission):
 
     def has_object_permission(self, request, view, obj):
         return (request.method in SAFE_METHODS
-                or obj.author == request.user)
+                or obj.author_id == request.user.pk)
 
 
 class IsAdminOrAuthorOrReadOnly(BasePermission):
@@ -20,7 +20,7 @@ class IsAdminOrAuthorOrReadOnly(BasePermission):
 
     def has_object_permission(self, request, view, obj):
         return (request.method in SAFE_METHODS
-                or obj.author == request.user
+                or obj.author_id == request.user.pk
                 or request.user.is_superuser
                 or request.user.is_staff)
 
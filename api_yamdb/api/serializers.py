@@ -1,21 +1,22 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.shortcuts import get_object_or_404
+from django.db import transaction
 from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework.relations import SlugRelatedField
 from rest_framework.validators import UniqueValidator
 
+from reviews.mail import get_mail_queue
 from reviews.models import Category, Comment, Genre, Review, Title
+from .mixins import TimedSerializerMixin
 
 User = get_user_model()
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serialization of all reciew requests."""
 
     author = SlugRelatedField(slug_field='username', read_only=True)
@@ -23,24 +24,14 @@ class ReviewSerializer(serializers.ModelSerializer):
         validators=[MinValueValidator(0), MaxValueValidator(10)]
     )
 
-    def validate(self, obj):
-        request = self.context['request']
-        if request.method != 'POST':
-            return obj
-        title = get_object_or_404(
-            Title, pk=self.context['view'].kwargs.get('title_id')
-        )
-        if Review.objects.filter(title=title,
-                                 author=request.user).exists():
-            raise ValidationError('Re-comment')
-        return obj
-
     class Meta:
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = ('id', 'text', 'author', 'score', 'pub_date',
+                  'comment_count')
+        read_only_fields = ('comment_count',)
         model = Review
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serialization of all comment requests."""
 
     author = SlugRelatedField(slug_field='username', read_only=True)
@@ -50,7 +41,7 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serialization of all genre requests."""
 
     class Meta:
@@ -59,7 +50,7 @@ class GenreSerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serialization of all category requests."""
 
     class Meta:
@@ -68,7 +59,7 @@ class CategorySerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
-class TitleSerializerGet(serializers.ModelSerializer):
+class TitleSerializerGet(TimedSerializerMixin, serializers.ModelSerializer):
     """Serialization of GET title requests."""
 
     genre = GenreSerializer(many=True, required=False)
@@ -76,12 +67,12 @@ class TitleSerializerGet(serializers.ModelSerializer):
     rating = serializers.IntegerField()
 
     class Meta:
-        fields = ('id', 'name', 'year', 'rating',
+        fields = ('id', 'name', 'year', 'rating', 'review_count',
                   'description', 'genre', 'category')
         model = Title
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serialization of POST, PUTCH, DELETE title requests."""
 
     genre = serializers.SlugRelatedField(
@@ -104,7 +95,16 @@ class TitleSerializer(serializers.ModelSerializer):
         return value
 
 
-class AuthSerializer(serializers.ModelSerializer):
+class TitleBulkSerializer(TitleSerializer):
+    """Validation of one title of a bulk request, slugs are resolved later."""
+
+    genre = serializers.ListField(
+        child=serializers.SlugField(), required=False
+    )
+    category = serializers.SlugField()
+
+
+class AuthSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serialization of all auth requests."""
 
     class Meta:
@@ -137,12 +137,13 @@ class AuthSerializer(serializers.ModelSerializer):
             )
         return username
 
+    @transaction.atomic
     def get_confirm_code(self, **kwargs):
         user = User.objects.create(
             **self.validated_data, last_login=timezone.now()
         )
         confirmation_code = default_token_generator.make_token(user)
-        send_mail(
+        get_mail_queue().enqueue(
             "Confirmation code",
             f"Your confirmation code: {confirmation_code}",
             settings.ADMIN_EMAIL,
@@ -150,7 +151,7 @@ class AuthSerializer(serializers.ModelSerializer):
         )
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serialization of all user requests except admin."""
 
     role = serializers.CharField(read_only=True)
@@ -161,7 +162,7 @@ class UserSerializer(serializers.ModelSerializer):
                   'last_name', 'role', 'username')
 
 
-class AdminUserSerializer(serializers.ModelSerializer):
+class AdminUserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serialization of all admin requests."""
 
     class Meta:
@@ -170,9 +171,10 @@ class AdminUserSerializer(serializers.ModelSerializer):
                   'last_name', 'role', 'username')
 
 
-class TokenSerializer(serializers.ModelSerializer):
+class TokenSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serialization request token."""
 
+    username = serializers.CharField(max_length=150)
     confirmation_code = serializers.CharField(allow_blank=False)
 
     class Meta:
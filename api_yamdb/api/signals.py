@@ -0,0 +1,55 @@
+from django.db.models.signals import post_delete, post_save
+from django.db import transaction
+from django.dispatch import receiver
+
+from reviews.models import Category, Genre, Title, User
+from reviews.signals import bulk_data_loaded, titles_bulk_created
+from . import autocomplete, cache
+from .authentication import forget_token_version
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, **kwargs):
+    cache.invalidate('categories')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genre_changed(sender, **kwargs):
+    cache.invalidate('genres')
+
+
+@receiver(bulk_data_loaded)
+def bulk_data_changed(sender, **kwargs):
+    cache.invalidate('categories')
+    cache.invalidate('genres')
+    # Makes the autocomplete index catch up with the loaded titles.
+    cache.invalidate(autocomplete.CACHE_PREFIX)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # Requests running before the commit still see the old version.
+    user_id = instance.pk
+    transaction.on_commit(lambda: forget_token_version(user_id))
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, **kwargs):
+    titles = [(instance.pk, instance.name, instance.year)]
+    transaction.on_commit(lambda: autocomplete.index.add_titles(titles))
+
+
+@receiver(titles_bulk_created, sender=Title)
+def titles_created(sender, titles, **kwargs):
+    titles = [(title.pk, title.name, title.year) for title in titles]
+    transaction.on_commit(lambda: autocomplete.index.add_titles(titles))
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    title_ids = [instance.pk]
+    transaction.on_commit(
+        lambda: autocomplete.index.remove_titles(title_ids))
@@ -0,0 +1,68 @@
+"""Token bucket rate limits of the authentication endpoints."""
+from hashlib import md5
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket kept in the cache: a rate of `N/period` allows bursts
+    of N requests and refills N tokens per period.
+    A request may belong to several buckets, it has to fit all of them.
+    """
+
+    def get_idents(self, request, view):
+        raise NotImplementedError('.get_idents() must be overridden')
+
+    def get_cache_key(self, request, view):
+        # Keys of all buckets are built in allow_request.
+        return None
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.now = self.timer()
+        refill = self.num_requests / self.duration
+        buckets = {}
+        self.wait_time = 0
+        for ident in self.get_idents(request, view):
+            key = self.cache_format % {'scope': self.scope, 'ident': ident}
+            tokens, updated = self.cache.get(key, (self.num_requests, 0))
+            tokens = min(self.num_requests,
+                         tokens + (self.now - updated) * refill)
+            if tokens < 1:
+                self.wait_time = max(self.wait_time, (1 - tokens) / refill)
+            buckets[key] = tokens
+        if self.wait_time:
+            return False
+        for key, tokens in buckets.items():
+            self.cache.set(key, (tokens - 1, self.now), self.duration)
+        return True
+
+    def wait(self):
+        return self.wait_time
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    """Limit authentication requests per client address."""
+
+    scope = 'auth_ip'
+
+    def get_idents(self, request, view):
+        return [f'{view.action}_{self.get_ident(request)}']
+
+
+class AuthIdentityThrottle(TokenBucketThrottle):
+    """Limit authentication requests per username and per email."""
+
+    scope = 'auth_identity'
+
+    def get_idents(self, request, view):
+        idents = []
+        for field in ('username', 'email'):
+            value = request.data.get(field)
+            if isinstance(value, str) and value.strip():
+                # Hashed to keep arbitrary input out of the cache keys.
+                value = md5(value.strip().lower().encode()).hexdigest()
+                idents.append(f'{view.action}_{field}_{value}')
+        return idents
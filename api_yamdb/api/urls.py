@@ -3,7 +3,8 @@ from rest_framework.routers import DefaultRouter
 
 from .views import (ReviewViewSet, CommentViewSet,
                     GenryViewSet, CategoryViewSet,
-                    TitleViewSet, AuthViewSet, UserViewSet)
+                    TitleViewSet, AuthViewSet, UserViewSet, MetricsView,
+                    ExportView)
 
 app_name = 'api'
 
@@ -22,5 +23,7 @@ router.register(r'users', UserViewSet, basename='users')
 
 
 urlpatterns = [
+    path('v1/metrics/', MetricsView.as_view(), name='metrics'),
+    path('v1/export/<str:resource>/', ExportView.as_view(), name='export'),
     path('v1/', include(router.urls)),
 ]
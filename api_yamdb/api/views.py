@@ -1,24 +1,41 @@
+from collections import defaultdict
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.db.models import Prefetch
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Avg
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.views import APIView
 
+from reviews.bulk import create_titles
+from reviews.ratings import rating_stats, top_titles
 from reviews.models import Category, Genre, Title, Review
-from .filters import TitleFilter
-from .mixins import ListCreateDestroyViewSet
+from . import autocomplete
+from .authentication import ClaimsRefreshToken
+from .export import EXPORTS, FORMATS, RENDERERS, parse_updated_since
+from .filters import IdTieOrderingFilter, TitleFilter, TitleSearchFilter
+from .metrics import registry, serializer_timer
+from .mixins import (CachedListMixin, ConditionalGetMixin, FastReadMixin,
+                     ListCreateDestroyViewSet, NestedResourceMixin,
+                     format_datetime)
+from .pagination import LimitOffsetOrCursorPagination
 from .permissions import (IsAdminOrAuthorOrReadOnly, CustomAdminPermission,
                           SafeMethodAdminPermission)
 from .serializers import (AuthSerializer, CategorySerializer, GenreSerializer,
-                          TitleSerializer, TitleSerializerGet,
+                          TitleBulkSerializer, TitleSerializer,
+                          TitleSerializerGet,
                           AdminUserSerializer, CommentSerializer,
                           ReviewSerializer, UserSerializer, TokenSerializer)
+from .throttling import AuthIdentityThrottle, AuthIPThrottle
 
 User = get_user_model()
 
@@ -56,7 +73,7 @@ class UserViewSet(viewsets.ModelViewSet):
             permission_classes=[IsAuthenticated])
     def me(self, request):
         """Getting or changing your account information."""
-        user = request.user
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'GET':
             serializer = self.get_serializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -72,7 +89,8 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response(serializer.data)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, FastReadMixin, NestedResourceMixin,
+                    viewsets.ModelViewSet):
     """
     list:
     Getting a list of all reviews.
@@ -91,17 +109,42 @@ class ReviewViewSet(viewsets.ModelViewSet):
     """
     serializer_class = ReviewSerializer
     permission_classes = [IsAdminOrAuthorOrReadOnly]
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ('-pub_date', '-id')
+    filter_backends = (IdTieOrderingFilter,)
+    ordering_fields = ('comment_count', 'pub_date')
+    parent_model = Title
+    parent_lookups = {'title_id': 'pk'}
+    fast_fields = ('id', 'text', 'author__username', 'score', 'pub_date',
+                   'comment_count')
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
-
-    def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        return self.get_parent().reviews.select_related('author')
 
+    def get_fast_data(self, rows):
+        return [
+            {'id': row['id'], 'text': row['text'],
+             'author': row['author__username'], 'score': row['score'],
+             'pub_date': format_datetime(row['pub_date']),
+             'comment_count': row['comment_count']}
+            for row in rows
+        ]
 
-class CommentViewSet(viewsets.ModelViewSet):
+    def perform_create(self, serializer):
+        title = self.get_parent()
+        # The unique_review constraint decides between parallel requests,
+        # Review.save rolls its transaction back when the insert fails.
+        try:
+            serializer.save(author_id=self.request.user.pk, title=title)
+        except IntegrityError:
+            if not title.reviews.filter(
+                    author_id=self.request.user.pk).exists():
+                raise
+            raise ValidationError({'non_field_errors': ['Re-comment']})
+
+
+class CommentViewSet(ConditionalGetMixin, FastReadMixin,
+                     NestedResourceMixin, viewsets.ModelViewSet):
     """
     list:
     Getting a list of all comments on a review.
@@ -120,17 +163,29 @@ class CommentViewSet(viewsets.ModelViewSet):
     """
     serializer_class = CommentSerializer
     permission_classes = [IsAdminOrAuthorOrReadOnly]
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ('-pub_date', '-id')
+    parent_model = Review
+    parent_lookups = {'review_id': 'pk', 'title_id': 'title_id'}
+    fast_fields = ('id', 'text', 'author__username', 'pub_date')
 
     def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        return review.comments.all()
+        return self.get_parent().comments.select_related('author')
+
+    def get_fast_data(self, rows):
+        return [
+            {'id': row['id'], 'text': row['text'],
+             'author': row['author__username'],
+             'pub_date': format_datetime(row['pub_date'])}
+            for row in rows
+        ]
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(
+            author_id=self.request.user.pk, review=self.get_parent())
 
 
-class CategoryViewSet(ListCreateDestroyViewSet):
+class CategoryViewSet(CachedListMixin, ListCreateDestroyViewSet):
     """
     list:
     Getting a list of all categories.
@@ -143,13 +198,14 @@ class CategoryViewSet(ListCreateDestroyViewSet):
     """
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_prefix = 'categories'
     lookup_field = 'slug'
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     permission_classes = (SafeMethodAdminPermission,)
 
 
-class GenryViewSet(ListCreateDestroyViewSet):
+class GenryViewSet(CachedListMixin, ListCreateDestroyViewSet):
     """
     list:
     Getting a list of all genres.
@@ -162,13 +218,14 @@ class GenryViewSet(ListCreateDestroyViewSet):
     """
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_prefix = 'genres'
     lookup_field = 'slug'
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     permission_classes = (SafeMethodAdminPermission,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, FastReadMixin, viewsets.ModelViewSet):
     """
     list:
     Getting a list of all products.
@@ -185,17 +242,150 @@ class TitleViewSet(viewsets.ModelViewSet):
     destroy:
     Deleting a product.
     """
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+    queryset = Title.objects.select_related('category').prefetch_related(
+        Prefetch('genre', queryset=Genre.objects.order_by('id')))
     serializer_class = TitleSerializer
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, TitleSearchFilter,
+                       IdTieOrderingFilter)
     filter_class = TitleFilter
+    ordering_fields = ('review_count', 'rating')
     permission_classes = (SafeMethodAdminPermission,)
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = 'id'
+    fast_fields = ('id', 'name', 'year', 'rating', 'review_count',
+                   'description', 'category__name', 'category__slug')
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return TitleSerializerGet
         return TitleSerializer
 
+    def get_fast_data(self, rows):
+        rows = list(rows)
+        genres = defaultdict(list)
+        links = Title.genre.through.objects.filter(
+            title_id__in=[row['id'] for row in rows]
+        ).order_by('genre_id').values_list(
+            'title_id', 'genre__name', 'genre__slug')
+        for title_id, name, slug in links:
+            genres[title_id].append({'name': name, 'slug': slug})
+        return [
+            {'id': row['id'], 'name': row['name'], 'year': row['year'],
+             'rating': (None if row['rating'] is None
+                        else int(row['rating'])),
+             'review_count': row['review_count'],
+             'description': row['description'],
+             'genre': genres[row['id']],
+             'category': (None if row['category__slug'] is None else
+                          {'name': row['category__name'],
+                           'slug': row['category__slug']})}
+            for row in rows
+        ]
+
+    @action(detail=False, methods=['POST'])
+    def bulk(self, request):
+        """Adding a list of products, invalid items are reported."""
+        if not isinstance(request.data, list):
+            raise ValidationError(
+                {'non_field_errors': ['Expected a list of titles.']})
+        if len(request.data) > settings.TITLES_BULK_MAX_SIZE:
+            raise ValidationError({'non_field_errors': [
+                f'No more than {settings.TITLES_BULK_MAX_SIZE} titles.']})
+        items, errors = [], []
+        for index, data in enumerate(request.data):
+            serializer = TitleBulkSerializer(data=data)
+            if serializer.is_valid():
+                items.append((index, serializer.validated_data))
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+        genres = self.resolve_slugs(Genre, {
+            slug for _, item in items for slug in item.get('genre', [])})
+        categories = self.resolve_slugs(
+            Category, {item['category'] for _, item in items})
+        titles, genre_ids, created = [], [], []
+        for index, item in items:
+            item_errors = {}
+            missing = [slug for slug in item.get('genre', [])
+                       if slug not in genres]
+            if missing:
+                item_errors['genre'] = [
+                    f'Object with slug={slug} does not exist.'
+                    for slug in missing]
+            if item['category'] not in categories:
+                item_errors['category'] = [
+                    f'Object with slug={item["category"]} does not exist.']
+            if item_errors:
+                errors.append({'index': index, 'errors': item_errors})
+                continue
+            slugs = list(dict.fromkeys(item.get('genre', [])))
+            titles.append(Title(
+                name=item['name'], year=item['year'],
+                description=item['description'],
+                category_id=categories[item['category']]))
+            genre_ids.append([genres[slug] for slug in slugs])
+            created.append({**item, 'genre': slugs})
+        if titles:
+            create_titles(titles, genre_ids)
+        errors.sort(key=lambda error: error['index'])
+        return Response(
+            {'created': [{'id': title.id, **item}
+                         for title, item in zip(titles, created)],
+             'errors': errors},
+            status=status.HTTP_201_CREATED if titles
+            else status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['GET'])
+    def top(self, request):
+        """Getting the best rated products of a genre or category."""
+        params = {}
+        for name, default in (('limit', settings.TOP_TITLES_LIMIT),
+                              ('min_reviews', 1)):
+            try:
+                params[name] = max(
+                    int(request.query_params.get(name, default)), 1)
+            except ValueError:
+                raise ValidationError({name: ['A valid integer is required.']})
+        ids = top_titles(
+            genre=request.query_params.get('genre'),
+            category=request.query_params.get('category'),
+            min_reviews=params['min_reviews'],
+            limit=min(params['limit'], settings.TOP_TITLES_MAX_LIMIT))
+        queryset = self.get_queryset().filter(pk__in=ids)
+        if self.use_fast_path(request):
+            titles = {row['id']: row
+                      for row in queryset.values(*self.fast_fields)}
+            with serializer_timer():
+                data = self.get_fast_data(
+                    [titles[pk] for pk in ids if pk in titles])
+        else:
+            titles = {title.pk: title for title in queryset}
+            data = TitleSerializerGet(
+                [titles[pk] for pk in ids if pk in titles], many=True).data
+        return Response(data)
+
+    @action(detail=False, methods=['GET'])
+    def autocomplete(self, request):
+        """Getting the products whose name starts with `q`."""
+        try:
+            limit = max(int(request.query_params.get(
+                'limit', settings.AUTOCOMPLETE_LIMIT)), 1)
+        except ValueError:
+            raise ValidationError({'limit': ['A valid integer is required.']})
+        return Response(autocomplete.index.search(
+            request.query_params.get('q', ''),
+            min(limit, settings.AUTOCOMPLETE_MAX_LIMIT)))
+
+    @action(detail=True, methods=['GET'], url_path='rating-stats')
+    def rating_stats(self, request, pk=None):
+        """Getting the distribution of the product review scores."""
+        if not Title.objects.filter(pk=pk).exists():
+            raise Http404
+        return Response(rating_stats(pk))
+
+    def resolve_slugs(self, model, slugs):
+        return dict(model.objects.filter(slug__in=slugs).values_list(
+            'slug', 'id'))
+
 
 class AuthViewSet(viewsets.GenericViewSet):
     """
@@ -203,6 +393,7 @@ class AuthViewSet(viewsets.GenericViewSet):
     Getting a JWT token in exchange for username and confirmation code..
     """
     permission_classes = [permissions.AllowAny]
+    throttle_classes = (AuthIPThrottle, AuthIdentityThrottle)
     serializer_class = AuthSerializer
 
     @action(detail=False, methods=['POST'])
@@ -225,7 +416,46 @@ class AuthViewSet(viewsets.GenericViewSet):
                             status=status.HTTP_400_BAD_REQUEST)
         user.is_active = True
         user.save()
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
         tokens = dict(access_token=str(refresh.access_token),
                       refresh_token=str(refresh))
         return Response(tokens, status=status.HTTP_200_OK)
+
+
+class MetricsView(APIView):
+    """Request metrics of this process in the Prometheus text format."""
+    permission_classes = (CustomAdminPermission,)
+
+    def get(self, request):
+        return HttpResponse(
+            registry.render_prometheus(),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+
+
+class ExportView(APIView):
+    """
+    Streaming export of titles, reviews or comments for administrators.
+    `fmt` is ndjson or csv, `updated_since` limits it to changed rows.
+    """
+    permission_classes = (CustomAdminPermission,)
+
+    def get(self, request, resource):
+        if resource not in EXPORTS:
+            raise Http404
+        fmt = request.query_params.get('fmt', 'ndjson')
+        if fmt not in FORMATS:
+            raise ValidationError(
+                {'fmt': [f'Choose one of: {", ".join(FORMATS)}.']})
+        updated_since = request.query_params.get('updated_since')
+        if updated_since is not None:
+            try:
+                updated_since = parse_updated_since(updated_since)
+            except ValueError as error:
+                raise ValidationError({'updated_since': [str(error)]})
+        export = EXPORTS[resource](updated_since)
+        response = StreamingHttpResponse(
+            RENDERERS[fmt](export), content_type=FORMATS[fmt])
+        response['Content-Disposition'] = (
+            f'attachment; filename="{resource}.{fmt}"')
+        return response
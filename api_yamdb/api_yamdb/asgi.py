@@ -1,7 +1,11 @@
 import os
 
-from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+
+from api.asgi import CatalogueApplication
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+# Django 2.2 has no ASGI handler: the requests run the WSGI handler in
+# a pool of threads, anonymous catalogue reads being coalesced per URL.
+application = CatalogueApplication(get_wsgi_application())
@@ -0,0 +1,37 @@
+"""Database profiles selected with the YAMDB_DB_PROFILE variable."""
+PROFILES = {
+    # Defaults of the Django SQLite backend.
+    'development': {
+        'CONN_MAX_AGE': 0,
+        'PRAGMAS': {},
+        'IMMEDIATE_TRANSACTIONS': False,
+    },
+    'production': {
+        'CONN_MAX_AGE': 600,
+        'PRAGMAS': {
+            # Readers do not block the writer and the other way round.
+            'journal_mode': 'WAL',
+            # Safe with WAL, the last commits may only be lost on power loss.
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,
+            # Negative values are KiB: 64 MiB of page cache per connection.
+            'cache_size': -64000,
+            'mmap_size': 256 * 1024 * 1024,
+            'temp_store': 'MEMORY',
+        },
+        'IMMEDIATE_TRANSACTIONS': True,
+    },
+}
+
+
+def database_settings(name, profile):
+    """Settings of the default database with the tuning of the profile."""
+    if profile not in PROFILES:
+        raise ValueError(
+            f'Unknown database profile {profile!r}, '
+            f'choose one of: {", ".join(PROFILES)}.')
+    return {
+        'ENGINE': 'api_yamdb.sqlite',
+        'NAME': name,
+        **PROFILES[profile],
+    }
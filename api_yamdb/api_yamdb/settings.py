@@ -1,5 +1,7 @@
 import os
 
+from .db import database_settings
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # The secret key is used as an example.
@@ -25,6 +27,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,13 +59,40 @@ TEMPLATES = [
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 
+# YAMDB_DB_PROFILE=production enables WAL, persistent connections and
+# the other settings of api_yamdb/db.py.
 DATABASES = {
+    'default': database_settings(
+        os.path.join(BASE_DIR, 'db.sqlite3'),
+        os.environ.get('YAMDB_DB_PROFILE', 'development'),
+    ),
+}
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Seconds a cached category or genre list may be served. Saves in
+# other processes are not seen by a local-memory cache before that.
+LIST_CACHE_TIMEOUT = 600
+
+TITLES_BULK_MAX_SIZE = 5000
+# Build title, review and comment GET responses from `.values()` rows.
+FAST_READ_PATH = True
+# Threads of the ASGI application which run the requests.
+ASGI_READ_WORKERS = 8
+TOP_TITLES_LIMIT = 10
+TOP_TITLES_MAX_LIMIT = 100
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+# Seconds between checks of the autocomplete index for titles changed
+# by other processes. With a shared cache they are also seen at once.
+AUTOCOMPLETE_MAX_AGE = 60
+# Rows fetched from the database at once by the export.
+EXPORT_CHUNK_SIZE = 2000
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -97,11 +127,28 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 5,
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'api.authentication.StatelessJWTAuthentication',
+    ),
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': '30/min',
+        'auth_identity': '10/min',
+    },
+    # Throttles trust X-Forwarded-For only behind this many proxies,
+    # otherwise clients could pick their address with the header.
+    'NUM_PROXIES': int(os.environ.get('YAMDB_NUM_PROXIES', 0)),
 }
 
+# Token versions are cached per process with the local memory cache,
+# so a revoked token may be accepted by other processes for this long.
+TOKEN_VERSION_CACHE_TIMEOUT = 60
+
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 ADMIN_EMAIL = "from@example.com"
+# "reviews.mail.OutboxMailQueue" stores emails for `run_mail_worker`,
+# "reviews.mail.ImmediateMailQueue" sends them inside the request.
+MAIL_QUEUE_BACKEND = "reviews.mail.OutboxMailQueue"
+MAIL_MAX_ATTEMPTS = 5
+MAIL_RETRY_DELAY = 30
+MAIL_RETRY_MAX_DELAY = 3600
 AUTH_USER_MODEL = "reviews.User"
@@ -0,0 +1,23 @@
+"""SQLite backend which applies the tuning of the database profile."""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Run the `PRAGMAS` of the database settings on every new connection.
+    With `IMMEDIATE_TRANSACTIONS` atomic blocks take the write lock when
+    they start, so concurrent writers wait for each other within the busy
+    timeout instead of failing when a read lock cannot be upgraded.
+    """
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict.get('PRAGMAS', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.settings_dict.get('IMMEDIATE_TRANSACTIONS'):
+            self.cursor().execute('BEGIN IMMEDIATE')
+        else:
+            super()._start_transaction_under_autocommit()
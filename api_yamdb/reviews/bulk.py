@@ -0,0 +1,87 @@
+"""Helpers of the code which loads rows with bulk_create."""
+from contextlib import contextmanager
+
+from django.core.management.color import no_style
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Max
+
+from . import counters, ratings, search
+from .models import Title
+from .signals import bulk_data_loaded, titles_bulk_created
+
+ID_ALLOCATION_ATTEMPTS = 3
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """Let bulk_create store the given dates instead of now()."""
+    fields = [field for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def reset_sequences(models):
+    """Move id sequences past the ids inserted explicitly."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def refresh_derived_data():
+    """Rebuild the data which bulk_create does not maintain."""
+    with transaction.atomic():
+        ratings.rebuild_ratings()
+        counters.rebuild_comment_counts()
+    search.rebuild_index()
+    bulk_data_loaded.send(sender=None)
+
+
+def last_id(model):
+    """
+    Highest id the table has used. SQLite AUTOINCREMENT keeps it in
+    sqlite_sequence, so ids of deleted rows are not given out again.
+    """
+    last = model.objects.aggregate(last=Max('id'))['last'] or 0
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT seq FROM sqlite_sequence WHERE name = %s',
+                           [model._meta.db_table])
+            row = cursor.fetchone()
+        if row is not None:
+            last = max(last, row[0])
+    return last
+
+
+def create_titles(titles, genre_ids):
+    """
+    Insert the titles and links to their genres in one transaction.
+    bulk_create does not set ids on SQLite, so they are allocated after
+    the last id the table has used and the insert is retried if another
+    request takes them first.
+    """
+    for attempt in range(ID_ALLOCATION_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                first_id = last_id(Title) + 1
+                for number, title in enumerate(titles):
+                    title.id = first_id + number
+                Title.objects.bulk_create(titles)
+                Title.genre.through.objects.bulk_create([
+                    Title.genre.through(title_id=title.id, genre_id=genre_id)
+                    for title, ids in zip(titles, genre_ids)
+                    for genre_id in ids
+                ])
+            break
+        except IntegrityError:
+            if attempt == ID_ALLOCATION_ATTEMPTS - 1:
+                raise
+    reset_sequences([Title])
+    titles_bulk_created.send(sender=Title, titles=titles)
+    return titles
@@ -0,0 +1,23 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Comment, Review
+
+
+def count_comments(review_id, delta):
+    """Change the number of comments shown with the review."""
+    Review.objects.filter(pk=review_id).update(
+        comment_count=F('comment_count') + delta,
+        updated=timezone.now(),
+    )
+
+
+def rebuild_comment_counts(reviews=None):
+    """Recount the comments of the reviews, all of them by default."""
+    if reviews is None:
+        reviews = Review.objects.all()
+    comments = (Comment.objects.filter(review=OuterRef('pk'))
+                .order_by().values('review')
+                .annotate(total=Count('id')).values('total'))
+    return reviews.update(comment_count=Coalesce(Subquery(comments), 0))
@@ -0,0 +1,86 @@
+"""Delivery of emails outside of the request thread."""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutgoingEmail
+
+
+class OutboxMailQueue:
+    """Stores emails in the outbox table for `run_mail_worker`."""
+
+    def enqueue(self, subject, message, from_email, recipient_list):
+        OutgoingEmail.objects.create(
+            subject=subject, body=message, from_email=from_email,
+            to=','.join(recipient_list),
+        )
+
+
+class ImmediateMailQueue:
+    """Sends emails right away in the calling thread."""
+
+    def enqueue(self, subject, message, from_email, recipient_list):
+        send_mail(subject, message, from_email, recipient_list)
+
+
+def get_mail_queue():
+    return import_string(settings.MAIL_QUEUE_BACKEND)()
+
+
+def retry_delay(attempts):
+    """Exponential backoff after the given number of failed attempts."""
+    delay = settings.MAIL_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.MAIL_RETRY_MAX_DELAY))
+
+
+def mark_failed(email, error):
+    email.attempts += 1
+    email.last_error = str(error)
+    email.next_attempt = timezone.now() + retry_delay(email.attempts)
+
+
+def send(email, connection):
+    message = EmailMessage(
+        email.subject, email.body, email.from_email,
+        email.to.split(','), connection=connection,
+    )
+    try:
+        message.send()
+    except Exception as error:
+        mark_failed(email, error)
+    else:
+        email.sent = timezone.now()
+
+
+def deliver_pending(batch_size, max_attempts):
+    """
+    Send one batch of due emails over a single connection.
+    Returns the number of emails taken from the outbox.
+    """
+    now = timezone.now()
+    emails = list(
+        OutgoingEmail.objects
+        .filter(sent__isnull=True, attempts__lt=max_attempts,
+                next_attempt__lte=now)
+        .order_by('next_attempt', 'id')[:batch_size]
+    )
+    if not emails:
+        return 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            mark_failed(email, error)
+    else:
+        try:
+            for email in emails:
+                send(email, connection)
+        finally:
+            connection.close()
+    OutgoingEmail.objects.bulk_update(
+        emails, ['attempts', 'last_error', 'next_attempt', 'sent'])
+    return len(emails)
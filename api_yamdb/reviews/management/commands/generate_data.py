@@ -0,0 +1,200 @@
+import math
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from reviews.bulk import (keep_auto_now_add, refresh_derived_data,
+                          reset_sequences)
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+SCALES = {
+    'tiny': dict(users=50, titles=100, reviews=500, comments=1000),
+    'small': dict(users=1000, titles=10000, reviews=100000,
+                  comments=200000),
+    'medium': dict(users=10000, titles=100000, reviews=2000000,
+                   comments=5000000),
+    'large': dict(users=100000, titles=1000000, reviews=20000000,
+                  comments=50000000),
+}
+# Probability of each score from 0 to 10, users mostly like what they rate.
+SCORE_WEIGHTS = (1, 1, 1, 2, 3, 5, 8, 12, 15, 12, 8)
+WORDS = ('great', 'boring', 'story', 'actor', 'plot', 'music', 'ending',
+         'classic', 'drama', 'comedy', 'night', 'city', 'love', 'war',
+         'space', 'family', 'secret', 'road', 'summer', 'river')
+
+
+class Command(BaseCommand):
+    help = 'Fills the database with synthetic titles, reviews and comments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='small')
+        for name in ('users', 'titles', 'reviews', 'comments'):
+            parser.add_argument(
+                f'--{name}', type=int,
+                help=f'Number of {name}, overrides the scale.')
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Zipf exponent of the title popularity.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        sizes = dict(SCALES[options['scale']])
+        for name in sizes:
+            if options[name] is not None:
+                sizes[name] = options[name]
+        if min(sizes.values()) < 1:
+            raise CommandError('Every size must be a positive number.')
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        started = time.monotonic()
+
+        categories = self.generate(Category, self.categories(
+            options['categories']))
+        genres = self.generate(Genre, self.genres(options['genres']))
+        users = self.generate(User, self.users(sizes['users']))
+        titles = self.generate(Title, self.titles(
+            sizes['titles'], categories))
+        self.generate(Title.genre.through, self.title_genres(titles, genres))
+        reviews = self.generate(Review, self.reviews(
+            titles, users, sizes['reviews'], options['skew']))
+        self.generate(Comment, self.comments(
+            reviews, users, sizes['comments'] / sizes['reviews']))
+
+        reset_sequences([Category, Genre, User, Title, Title.genre.through,
+                         Review, Comment])
+        refresh_derived_data()
+        self.stdout.write(self.style.SUCCESS(
+            f'Done in {time.monotonic() - started:.1f}s.'))
+
+    def generate(self, model, objects):
+        """
+        Insert the objects with explicit ids after the current maximum.
+        Returns the range of the inserted ids.
+        """
+        first_id = (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+        next_id = first_id
+        started = time.monotonic()
+        batch = []
+        with keep_auto_now_add(model):
+            for obj in objects(first_id):
+                obj.id = next_id
+                next_id += 1
+                batch.append(obj)
+                if len(batch) >= self.batch_size:
+                    self.insert(model, batch)
+            self.insert(model, batch)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        count = next_id - first_id
+        self.stdout.write(
+            f'{model._meta.db_table}: {count} rows '
+            f'({count / elapsed:.0f} rows/s)')
+        return range(first_id, next_id)
+
+    def insert(self, model, batch):
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+        batch.clear()
+
+    def text(self, words):
+        return ' '.join(self.random.choice(WORDS) for _ in range(words))
+
+    def date(self):
+        return self.now - timedelta(seconds=self.random.randint(0, 10 ** 8))
+
+    def categories(self, count):
+        def build(first_id):
+            for number in range(first_id, first_id + count):
+                yield Category(name=f'Category {number}',
+                               slug=f'category-{number}')
+        return build
+
+    def genres(self, count):
+        def build(first_id):
+            for number in range(first_id, first_id + count):
+                yield Genre(name=f'Genre {number}', slug=f'genre-{number}')
+        return build
+
+    def users(self, count):
+        password = make_password(None)
+
+        def build(first_id):
+            for number in range(first_id, first_id + count):
+                yield User(username=f'user{number}',
+                           email=f'user{number}@yamdb.fake',
+                           password=password)
+        return build
+
+    def titles(self, count, categories):
+        def build(first_id):
+            for _ in range(count):
+                yield Title(
+                    name=self.text(self.random.randint(1, 4)).capitalize(),
+                    year=self.random.randint(1900, self.now.year),
+                    description=self.text(self.random.randint(5, 30)),
+                    category_id=self.random.choice(categories),
+                )
+        return build
+
+    def title_genres(self, titles, genres):
+        def build(first_id):
+            for title_id in titles:
+                for genre_id in self.random.sample(
+                        genres, self.random.randint(1, min(3, len(genres)))):
+                    yield Title.genre.through(
+                        title_id=title_id, genre_id=genre_id)
+        return build
+
+    def reviews(self, titles, users, count, skew):
+        # Title number i gets a share of reviews proportional to
+        # 1 / rank ** skew, where ranks are a permutation of the titles.
+        # A title cannot have more reviews than there are users, so the
+        # most popular titles are capped and the total may come out lower.
+        weights_sum = sum(
+            1 / rank ** skew for rank in range(1, len(titles) + 1))
+        step = self.coprime_step(len(titles))
+
+        def build(first_id):
+            for index, title_id in enumerate(titles):
+                rank = index * step % len(titles) + 1
+                expected = count * (1 / rank ** skew) / weights_sum
+                reviews = int(expected)
+                if self.random.random() < expected - reviews:
+                    reviews += 1
+                for author_id in self.random.sample(
+                        users, min(reviews, len(users))):
+                    yield Review(
+                        title_id=title_id, author_id=author_id,
+                        text=self.text(self.random.randint(5, 30)),
+                        score=self.random.choices(
+                            range(11), SCORE_WEIGHTS)[0],
+                        pub_date=self.date(),
+                    )
+        return build
+
+    def comments(self, reviews, users, mean):
+        def build(first_id):
+            for review_id in reviews:
+                for _ in range(int(self.random.expovariate(1 / mean))):
+                    yield Comment(
+                        review_id=review_id,
+                        author_id=self.random.choice(users),
+                        text=self.text(self.random.randint(3, 20)),
+                        pub_date=self.date(),
+                    )
+        return build
+
+    def coprime_step(self, count):
+        step = 7919 % count or 1
+        while math.gcd(step, count) != 1:
+            step += 1
+        return step
@@ -0,0 +1,170 @@
+import csv
+import os
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.utils.dateparse import parse_datetime
+
+from reviews.bulk import (keep_auto_now_add, refresh_derived_data,
+                          reset_sequences)
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+
+class IdMap:
+    """Compact set of integer ids stored as a bitmap."""
+
+    def __init__(self, ids=()):
+        self.bits = bytearray()
+        for pk in ids:
+            self.add(pk)
+
+    def add(self, pk):
+        byte, bit = divmod(pk, 8)
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte - len(self.bits) + 1))
+        self.bits[byte] |= 1 << bit
+
+    def __contains__(self, pk):
+        byte, bit = divmod(pk, 8)
+        return byte < len(self.bits) and bool(self.bits[byte] & (1 << bit))
+
+
+def optional_id(value):
+    return int(value) if value else None
+
+
+class Command(BaseCommand):
+    help = 'Loads the csv files of static/data into the database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Directory with the csv files.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rows kept in memory and sent in one bulk insert.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Batch size must be a positive number.')
+        self.path = options['path']
+        self.batch_size = options['batch_size']
+        self.ids = {}
+        files = (
+            ('category.csv', Category, self.build_category),
+            ('genre.csv', Genre, self.build_genre),
+            ('users.csv', User, self.build_user),
+            ('titles.csv', Title, self.build_title),
+            ('genre_title.csv', Title.genre.through, self.build_genre_title),
+            ('review.csv', Review, self.build_review),
+            ('comments.csv', Comment, self.build_comment),
+        )
+        for filename, model, build in files:
+            self.ids[model] = IdMap(
+                model.objects.values_list('id', flat=True).iterator())
+            self.load(filename, model, build)
+        reset_sequences([model for _, model, _ in files])
+        refresh_derived_data()
+
+    def load(self, filename, model, build):
+        filepath = os.path.join(self.path, filename)
+        if not os.path.exists(filepath):
+            self.stdout.write(self.style.WARNING(f'{filename} not found'))
+            return
+        started = time.monotonic()
+        loaded = skipped = 0
+        try:
+            with open(filepath, encoding='utf-8', newline='') as file, \
+                    transaction.atomic(), keep_auto_now_add(model):
+                batch = []
+                for row in csv.DictReader(file):
+                    # Rows loaded by a previous run are kept as they are,
+                    # so the command can reseed a database.
+                    if self.known(model, optional_id(row['id'])):
+                        skipped += 1
+                        continue
+                    obj = build(row)
+                    if obj is None:
+                        skipped += 1
+                        continue
+                    batch.append(obj)
+                    if len(batch) >= self.batch_size:
+                        loaded += self.insert(model, batch)
+                loaded += self.insert(model, batch)
+        except IntegrityError as error:
+            raise CommandError(
+                f'{filename} conflicts with the existing rows, '
+                f'nothing was loaded from it: {error}')
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f'{filename}: {loaded} rows in {elapsed:.2f}s '
+            f'({loaded / elapsed:.0f} rows/s), {skipped} skipped'))
+
+    def insert(self, model, batch):
+        model.objects.bulk_create(batch)
+        for obj in batch:
+            self.ids[model].add(obj.pk)
+        count = len(batch)
+        batch.clear()
+        return count
+
+    def known(self, model, value):
+        return value is not None and value in self.ids[model]
+
+    def build_category(self, row):
+        return Category(id=int(row['id']), name=row['name'], slug=row['slug'])
+
+    def build_genre(self, row):
+        return Genre(id=int(row['id']), name=row['name'], slug=row['slug'])
+
+    def build_user(self, row):
+        role = row['role'] or User.USER
+        return User(
+            id=int(row['id']), username=row['username'], email=row['email'],
+            role=role, bio=row['bio'], first_name=row['first_name'],
+            last_name=row['last_name'], password=make_password(None),
+            is_superuser=role == User.ADMIN, is_staff=role == User.MODERATOR,
+        )
+
+    def build_title(self, row):
+        category_id = optional_id(row['category'])
+        if category_id is not None and not self.known(Category, category_id):
+            return None
+        return Title(
+            id=int(row['id']), name=row['name'], year=int(row['year']),
+            description=row.get('description', ''), category_id=category_id,
+        )
+
+    def build_genre_title(self, row):
+        title_id = optional_id(row['title_id'])
+        genre_id = optional_id(row['genre_id'])
+        if not (self.known(Title, title_id) and self.known(Genre, genre_id)):
+            return None
+        return Title.genre.through(
+            id=int(row['id']), title_id=title_id, genre_id=genre_id)
+
+    def build_review(self, row):
+        title_id = optional_id(row['title_id'])
+        author_id = optional_id(row['author'])
+        if not (self.known(Title, title_id) and self.known(User, author_id)):
+            return None
+        return Review(
+            id=int(row['id']), title_id=title_id, author_id=author_id,
+            text=row['text'], score=int(row['score']),
+            pub_date=parse_datetime(row['pub_date']),
+        )
+
+    def build_comment(self, row):
+        review_id = optional_id(row['review_id'])
+        author_id = optional_id(row['author'])
+        if not (self.known(Review, review_id)
+                and self.known(User, author_id)):
+            return None
+        return Comment(
+            id=int(row['id']), review_id=review_id, author_id=author_id,
+            text=row['text'], pub_date=parse_datetime(row['pub_date']),
+        )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = ('Recalculates the stored ratings and score counts of all titles '
+            'from reviews.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = rebuild_ratings()
+        self.stdout.write(self.style.SUCCESS(
+            f'Ratings of {updated} titles have been rebuilt.'))
@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from reviews.mail import deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Sends emails from the outbox in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Number of emails sent over one connection.')
+        parser.add_argument(
+            '--max-attempts', type=int, default=settings.MAIL_MAX_ATTEMPTS,
+            help='Failed attempts after which an email is given up.')
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to wait when the outbox is empty.')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Deliver everything that is due and exit.')
+
+    def handle(self, *args, **options):
+        while True:
+            taken = deliver_pending(
+                options['batch_size'], options['max_attempts'])
+            if taken:
+                self.stdout.write(f'Processed {taken} emails.')
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
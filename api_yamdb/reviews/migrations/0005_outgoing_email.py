@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:39
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_title_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='Subject')),
+                ('body', models.TextField(verbose_name='Body')),
+                ('from_email', models.CharField(max_length=254, verbose_name='Sender')),
+                ('to', models.TextField(verbose_name='Recipients separated by commas')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Creation date')),
+                ('next_attempt', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Next delivery attempt')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Failed attempts')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last delivery error')),
+                ('sent', models.DateTimeField(blank=True, null=True, verbose_name='Delivery date')),
+            ],
+            options={
+                'verbose_name': 'Outgoing email',
+                'verbose_name_plural': 'Outgoing emails',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outgoingemail',
+            index=models.Index(fields=['sent', 'next_attempt'], name='outgoing_email_pending_idx'),
+        ),
+    ]
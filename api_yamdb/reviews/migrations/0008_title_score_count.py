@@ -0,0 +1,45 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:59
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_score_counts(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    TitleScoreCount = apps.get_model('reviews', 'TitleScoreCount')
+    connection = schema_editor.connection
+    sql, params = (Review.objects.order_by().values('title_id', 'score')
+                   .annotate(count=Count('id')).query.sql_with_params())
+    table = connection.ops.quote_name(TitleScoreCount._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (title_id, score, count) {sql}', params)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_user_token_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleScoreCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveSmallIntegerField(verbose_name='Score')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Number of reviews')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_counts', to='reviews.Title')),
+            ],
+            options={
+                'verbose_name': 'Score count',
+                'verbose_name_plural': 'Score counts',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='titlescorecount',
+            constraint=models.UniqueConstraint(fields=('title', 'score'), name='unique_title_score'),
+        ),
+        migrations.RunPython(fill_score_counts, migrations.RunPython.noop),
+    ]
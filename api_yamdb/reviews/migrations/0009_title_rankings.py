@@ -0,0 +1,85 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:01
+
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, FloatField, Value
+from django.db.models.functions import Cast, NullIf
+import django.db.models.deletion
+
+
+def fill_rankings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleGenreRanking = apps.get_model('reviews', 'TitleGenreRanking')
+    Title.objects.update(rating=ExpressionWrapper(
+        Cast(F('rating_sum'), FloatField())
+        / NullIf(F('rating_count'), Value(0)),
+        output_field=FloatField()))
+    connection = schema_editor.connection
+    sql, params = (
+        Title.genre.through.objects.order_by().values_list(
+            'genre_id', 'title_id', 'title__category_id', 'title__rating',
+            'title__rating_count').query.sql_with_params())
+    table = connection.ops.quote_name(TitleGenreRanking._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} '
+            f'(genre_id, title_id, category_id, rating, review_count) {sql}',
+            params)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_score_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleGenreRanking',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.FloatField(blank=True, null=True, verbose_name='Rating')),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='Number of reviews')),
+            ],
+            options={
+                'verbose_name': 'Genre ranking',
+                'verbose_name_plural': 'Genre rankings',
+            },
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, null=True, verbose_name='Rating'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-rating', '-id'], name='title_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-rating', '-id'], name='title_category_rating_idx'),
+        ),
+        migrations.AddField(
+            model_name='titlegenreranking',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='rankings', to='reviews.Category'),
+        ),
+        migrations.AddField(
+            model_name='titlegenreranking',
+            name='genre',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.Genre'),
+        ),
+        migrations.AddField(
+            model_name='titlegenreranking',
+            name='title',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.Title'),
+        ),
+        migrations.AddIndex(
+            model_name='titlegenreranking',
+            index=models.Index(fields=['genre', '-rating', '-title'], name='ranking_genre_rating_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='titlegenreranking',
+            constraint=models.UniqueConstraint(fields=('genre', 'title'), name='unique_genre_title_ranking'),
+        ),
+        migrations.RunPython(fill_rankings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:12
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_counts(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    comments = (Comment.objects.filter(review=OuterRef('pk'))
+                .order_by().values('review')
+                .annotate(total=Count('id')).values('total'))
+    Review.objects.update(comment_count=Coalesce(Subquery(comments), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_rankings'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='title',
+            old_name='rating_count',
+            new_name='review_count',
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Number of reviews'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Number of comments'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-review_count', '-id'], name='title_review_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', '-comment_count', '-id'], name='review_title_comments_idx'),
+        ),
+        migrations.RunPython(fill_comment_counts, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
+from django.utils import timezone
 
 from .validators import validate_year
 
@@ -14,18 +15,47 @@ class User(AbstractUser):
     ROLE_CHOICES = (
         (USER, 'user'), (MODERATOR, 'moderator'), (ADMIN, 'admin')
     )
+    # Fields signed into access tokens. Changing them or `is_active`
+    # bumps `token_version`, which revokes the issued tokens.
+    TOKEN_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser')
+    REVOKING_FIELDS = TOKEN_CLAIMS + ('is_active',)
     email = models.EmailField(max_length=60, unique=True)
     bio = models.CharField(max_length=200, blank=True)
     role = models.CharField(
         max_length=30, choices=ROLE_CHOICES, default=USER
     )
+    token_version = models.PositiveIntegerField(
+        'Version of issued tokens', default=0)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_username = instance.__dict__.get('username')
+        instance._loaded_claims = instance.current_claims()
+        return instance
+
+    def current_claims(self):
+        return {name: self.__dict__.get(name)
+                for name in self.REVOKING_FIELDS}
+
+    def claims_changed(self):
+        loaded = getattr(self, '_loaded_claims', {})
+        return any(value is not None and value != getattr(self, name)
+                   for name, value in loaded.items())
 
     def save(self, *args, **kwargs):
         if self.role == self.ADMIN:
             self.is_superuser = True
         elif self.role == self.MODERATOR:
             self.is_staff = True
+        if self.claims_changed():
+            self.token_version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {
+                    *kwargs['update_fields'], 'token_version'}
         super().save(*args, **kwargs)
+        self._loaded_username = self.username
+        self._loaded_claims = self.current_claims()
 
 
 class Category(models.Model):
@@ -71,14 +101,41 @@ class Title(models.Model):
         Category, verbose_name='Category',
         on_delete=models.SET_NULL, related_name="titles",
         blank=True, null=True)
+    rating_sum = models.PositiveIntegerField('Sum of scores', default=0)
+    # Every review has a score, so it is also the number of reviews.
+    review_count = models.PositiveIntegerField(
+        'Number of reviews', default=0)
+    rating = models.FloatField('Rating', blank=True, null=True)
+    updated = models.DateTimeField('Update date', auto_now=True, db_index=True)
+
+    RATING_FIELDS = ('rating_sum', 'review_count', 'rating')
 
     class Meta:
+        indexes = [
+            models.Index(fields=['-rating', '-id'],
+                         name='title_rating_idx'),
+            models.Index(fields=['category', '-rating', '-id'],
+                         name='title_category_rating_idx'),
+            models.Index(fields=['-review_count', '-id'],
+                         name='title_review_count_idx'),
+        ]
         verbose_name = 'Work'
         verbose_name_plural = 'Works'
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # The rating is changed by update queries of reviews.ratings,
+        # saving a stale instance must not overwrite it.
+        if (not self._state.adding and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.RATING_FIELDS]
+        super().save(*args, **kwargs)
+
 
 class Review(models.Model):
     """Review storage model."""
@@ -92,9 +149,12 @@ class Review(models.Model):
                     MaxValueValidator(10, 'No more than 10')]
     )
     pub_date = models.DateTimeField('Publication date', auto_now_add=True)
+    updated = models.DateTimeField('Update date', auto_now=True)
     title = models.ForeignKey(
         Title, on_delete=models.CASCADE,
         related_name='reviews')
+    comment_count = models.PositiveIntegerField(
+        'Number of comments', default=0)
 
     class Meta:
         constraints = [
@@ -102,6 +162,14 @@ class Review(models.Model):
                 fields=['author', 'title'],
                 name='unique_review')
         ]
+        indexes = [
+            models.Index(fields=['title', '-pub_date', '-id'],
+                         name='review_title_pub_date_idx'),
+            models.Index(fields=['title', 'updated'],
+                         name='review_title_updated_idx'),
+            models.Index(fields=['title', '-comment_count', '-id'],
+                         name='review_title_comments_idx'),
+        ]
         ordering = ('-pub_date',)
         verbose_name = 'Review'
         verbose_name_plural = 'Reviews'
@@ -109,6 +177,77 @@ class Review(models.Model):
     def __str__(self):
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # The comment count is changed by update queries of the comment
+        # receivers, saving a stale instance must not overwrite it.
+        if (not self._state.adding and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'comment_count']
+        # The title rating is updated by the post_save receiver,
+        # so both writes have to share one transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        self._loaded_score = self.score
+
+
+class TitleScoreCount(models.Model):
+    """Number of reviews of a title with the given score."""
+
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='score_counts')
+    score = models.PositiveSmallIntegerField('Score')
+    count = models.PositiveIntegerField('Number of reviews', default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score'],
+                name='unique_title_score')
+        ]
+        verbose_name = 'Score count'
+        verbose_name_plural = 'Score counts'
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score} x {self.count}'
+
+
+class TitleGenreRanking(models.Model):
+    """Rating of a title copied to each of its genres for leaderboards."""
+
+    genre = models.ForeignKey(
+        Genre, on_delete=models.CASCADE, related_name='rankings')
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='rankings')
+    category = models.ForeignKey(
+        Category, on_delete=models.SET_NULL, related_name='rankings',
+        blank=True, null=True)
+    rating = models.FloatField('Rating', blank=True, null=True)
+    review_count = models.PositiveIntegerField('Number of reviews', default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['genre', 'title'],
+                name='unique_genre_title_ranking')
+        ]
+        indexes = [
+            models.Index(fields=['genre', '-rating', '-title'],
+                         name='ranking_genre_rating_idx'),
+        ]
+        verbose_name = 'Genre ranking'
+        verbose_name_plural = 'Genre rankings'
+
+    def __str__(self):
+        return f'{self.genre_id}: {self.title_id}'
+
 
 class Comment(models.Model):
     """Comment storage model."""
@@ -119,10 +258,49 @@ class Comment(models.Model):
     review = models.ForeignKey(
         Review, on_delete=models.CASCADE, related_name='comments')
     pub_date = models.DateTimeField('Publication date', auto_now_add=True)
+    updated = models.DateTimeField('Update date', auto_now=True)
 
     class Meta:
+        indexes = [
+            models.Index(fields=['review', '-pub_date', '-id'],
+                         name='comment_review_pub_date_idx'),
+            models.Index(fields=['review', 'updated'],
+                         name='comment_review_updated_idx'),
+        ]
         verbose_name = 'Comment'
         verbose_name_plural = 'Comments'
 
     def __str__(self):
         return self.text
+
+    def save(self, *args, **kwargs):
+        # The comment count of the review is updated by the post_save
+        # receiver, so both writes have to share one transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class OutgoingEmail(models.Model):
+    """Email waiting in the outbox for the mail worker."""
+
+    subject = models.CharField('Subject', max_length=255)
+    body = models.TextField('Body')
+    from_email = models.CharField('Sender', max_length=254)
+    to = models.TextField('Recipients separated by commas')
+    created = models.DateTimeField('Creation date', auto_now_add=True)
+    next_attempt = models.DateTimeField(
+        'Next delivery attempt', default=timezone.now)
+    attempts = models.PositiveSmallIntegerField('Failed attempts', default=0)
+    last_error = models.TextField('Last delivery error', blank=True)
+    sent = models.DateTimeField('Delivery date', blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sent', 'next_attempt'],
+                         name='outgoing_email_pending_idx')
+        ]
+        verbose_name = 'Outgoing email'
+        verbose_name_plural = 'Outgoing emails'
+
+    def __str__(self):
+        return self.subject
@@ -0,0 +1,189 @@
+from django.db import IntegrityError, connection, transaction
+from django.db.models import (Count, ExpressionWrapper, F, FloatField,
+                              OuterRef, Subquery, Sum, Value)
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
+
+from .models import Review, Title, TitleGenreRanking, TitleScoreCount
+
+SCORES = range(11)
+
+
+def rating_of(total, count):
+    """Average score calculated by the database, NULL without scores."""
+    return ExpressionWrapper(
+        Cast(total, FloatField()) / NullIf(count, Value(0)),
+        output_field=FloatField())
+
+
+def insert_rows(model, columns, queryset):
+    """Insert the rows selected by the queryset with one statement."""
+    sql, params = queryset.query.sql_with_params()
+    table = connection.ops.quote_name(model._meta.db_table)
+    names = ', '.join(connection.ops.quote_name(name) for name in columns)
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {table} ({names}) {sql}', params)
+
+
+def count_score(title_id, score, delta):
+    """Change the number of reviews of the title with the score."""
+    counts = TitleScoreCount.objects.filter(title_id=title_id, score=score)
+    # A missing row can only be decremented while the title is deleted.
+    if counts.update(count=F('count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            TitleScoreCount.objects.create(
+                title_id=title_id, score=score, count=delta)
+    except IntegrityError:
+        counts.update(count=F('count') + delta)
+
+
+def add_score(title_id, score):
+    """Take a new review score into account in the title rating."""
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + score,
+        review_count=F('review_count') + 1,
+        rating=rating_of(F('rating_sum') + score, F('review_count') + 1),
+        updated=timezone.now(),
+    )
+    count_score(title_id, score, 1)
+    sync_rankings([title_id])
+
+
+def remove_score(title_id, score):
+    """Exclude a deleted review score from the title rating."""
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') - score,
+        review_count=F('review_count') - 1,
+        rating=rating_of(F('rating_sum') - score, F('review_count') - 1),
+        updated=timezone.now(),
+    )
+    count_score(title_id, score, -1)
+    sync_rankings([title_id])
+
+
+def change_score(title_id, old_score, new_score):
+    """Replace an edited review score in the title rating."""
+    if old_score == new_score:
+        return
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') - old_score + new_score,
+        rating=rating_of(F('rating_sum') - old_score + new_score,
+                         F('review_count')),
+        updated=timezone.now(),
+    )
+    count_score(title_id, old_score, -1)
+    count_score(title_id, new_score, 1)
+    sync_rankings([title_id])
+
+
+def rebuild_score_counts(titles=None):
+    """Recount the reviews of the titles per score in the database."""
+    counts = TitleScoreCount.objects.all()
+    reviews = Review.objects.all()
+    if titles is not None:
+        counts = counts.filter(title__in=titles)
+        reviews = reviews.filter(title__in=titles)
+    counts.delete()
+    insert_rows(
+        TitleScoreCount, ('title_id', 'score', 'count'),
+        reviews.order_by().values('title_id', 'score').annotate(
+            count=Count('id')))
+
+
+def rebuild_rankings(titles=None):
+    """Recreate the genre rankings of the titles from their genres."""
+    rankings = TitleGenreRanking.objects.all()
+    links = Title.genre.through.objects.all()
+    if titles is not None:
+        rankings = rankings.filter(title__in=titles)
+        links = links.filter(title__in=titles)
+    rankings.delete()
+    insert_rows(
+        TitleGenreRanking,
+        ('genre_id', 'title_id', 'category_id', 'rating', 'review_count'),
+        links.order_by().values_list(
+            'genre_id', 'title_id', 'title__category_id', 'title__rating',
+            'title__review_count'))
+
+
+def sync_rankings(title_ids):
+    """Copy the rating and category of the titles to their rankings."""
+    title = Title.objects.filter(pk=OuterRef('title_id'))
+    TitleGenreRanking.objects.filter(title_id__in=title_ids).update(
+        rating=Subquery(title.values('rating')),
+        review_count=Subquery(title.values('review_count')),
+        category_id=Subquery(title.values('category_id')),
+    )
+
+
+def top_titles(genre=None, category=None, min_reviews=1, limit=10):
+    """
+    Ids of the best rated titles of the genre and category slugs.
+    Both orderings are served by an index: the genre rankings for
+    genres and the rating of titles otherwise.
+    """
+    if genre is not None:
+        rows = TitleGenreRanking.objects.filter(genre__slug=genre)
+        id_field = 'title_id'
+    else:
+        rows = Title.objects.all()
+        id_field = 'id'
+    if category is not None:
+        rows = rows.filter(category__slug=category)
+    rows = rows.filter(rating__isnull=False, review_count__gte=min_reviews)
+    return list(rows.order_by('-rating', f'-{id_field}').values_list(
+        id_field, flat=True)[:limit])
+
+
+def rebuild_ratings(titles=None):
+    """Recalculate ratings, score counts and rankings of the titles."""
+    rebuild_score_counts(titles)
+    if titles is None:
+        titles = Title.objects.all()
+    reviews = (Review.objects.filter(title=OuterRef('pk'))
+               .order_by().values('title'))
+    updated = titles.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0),
+        review_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('id')).values('total')),
+            0),
+        updated=timezone.now(),
+    )
+    titles.update(rating=rating_of(F('rating_sum'), F('review_count')))
+    rebuild_rankings(titles)
+    return updated
+
+
+def median_score(histogram):
+    """Median of the scores counted by the histogram."""
+    total = sum(histogram)
+    if not total:
+        return None
+    positions = ((total - 1) // 2, total // 2)
+    found = []
+    seen = 0
+    for score, count in enumerate(histogram):
+        seen += count
+        while len(found) < len(positions) and positions[len(found)] < seen:
+            found.append(score)
+    return sum(found) / len(found)
+
+
+def rating_stats(title_id):
+    """Number, mean, median and histogram of the scores of the title."""
+    histogram = [0] * len(SCORES)
+    for score, count in TitleScoreCount.objects.filter(
+            title_id=title_id).values_list('score', 'count'):
+        histogram[score] = count
+    total = sum(histogram)
+    return {
+        'count': total,
+        'mean': (sum(score * count for score, count in enumerate(histogram))
+                 / total if total else None),
+        'median': median_score(histogram),
+        'histogram': histogram,
+    }
@@ -0,0 +1,90 @@
+"""Full-text index of titles built on the SQLite FTS5 extension."""
+from django.db import connection
+from django.db.models import Q
+
+from .models import Title
+
+FTS_TABLE = 'reviews_title_fts'
+# bm25 weights of the indexed columns: name, description.
+RANK_WEIGHTS = (10.0, 1.0)
+
+
+def is_supported(db_connection=connection):
+    return db_connection.vendor == 'sqlite'
+
+
+def create_index(db_connection):
+    with db_connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+            "USING fts5(name, description, tokenize='unicode61')"
+        )
+
+
+def drop_index(db_connection):
+    with db_connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def rebuild_index(db_connection=connection):
+    """Fill the index from scratch with all titles."""
+    if not is_supported(db_connection):
+        return
+    table = Title._meta.db_table
+    with db_connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            f'SELECT id, name, description FROM {table}'
+        )
+
+
+def index_titles(titles):
+    """Add the titles to the index or refresh their indexed text."""
+    if not is_supported() or not titles:
+        return
+    remove_titles([title.pk for title in titles])
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            f'VALUES (%s, %s, %s)',
+            [(title.pk, title.name, title.description) for title in titles]
+        )
+
+
+def remove_titles(title_ids):
+    if not is_supported() or not title_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(title_id,) for title_id in title_ids]
+        )
+
+
+def match_expression(query):
+    """Turn user input into an FTS5 query of prefix terms joined by AND."""
+    terms = []
+    for term in query.split():
+        term = term.replace('"', '""')
+        terms.append(f'"{term}"*')
+    return ' '.join(terms)
+
+
+def search_titles(queryset, query):
+    """Filter titles by the query, the most relevant ones first."""
+    if not query.split():
+        return queryset
+    if not is_supported():
+        return queryset.filter(
+            Q(name__icontains=query) | Q(description__icontains=query))
+    table = Title._meta.db_table
+    weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+    return queryset.extra(
+        select={'search_rank': f'bm25({FTS_TABLE}, {weights})'},
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = {table}.id',
+               f'{FTS_TABLE} MATCH %s'],
+        params=[match_expression(query)],
+        order_by=['search_rank', 'id'],
+    )
@@ -0,0 +1,122 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from . import counters, ratings, search
+from .models import (Category, Comment, Genre, Review, Title,
+                     TitleGenreRanking, User)
+
+# Sent by reviews.bulk.create_titles, which saves without post_save.
+titles_bulk_created = Signal(providing_args=['titles'])
+# Sent by reviews.bulk.refresh_derived_data once rows of any model
+# have been loaded with bulk_create, which sends no post_save.
+bulk_data_loaded = Signal()
+
+
+def touch(queryset):
+    """Mark objects whose representation has changed as updated."""
+    queryset.update(updated=timezone.now())
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    if created:
+        ratings.add_score(instance.title_id, instance.score)
+    elif hasattr(instance, '_loaded_score'):
+        ratings.change_score(
+            instance.title_id, instance._loaded_score, instance.score)
+    else:
+        ratings.rebuild_ratings(Title.objects.filter(pk=instance.title_id))
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    ratings.remove_score(instance.title_id, instance.score)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.count_comments(instance.review_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.count_comments(instance.review_id, -1)
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, **kwargs):
+    search.index_titles([instance])
+    if not created:
+        ratings.sync_rankings([instance.pk])
+
+
+@receiver(titles_bulk_created, sender=Title)
+def titles_created(sender, titles, **kwargs):
+    search.index_titles(titles)
+    ratings.rebuild_rankings(
+        Title.objects.filter(pk__in=[title.pk for title in titles]))
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    search.remove_titles([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, **kwargs):
+    if not created:
+        touch(Title.objects.filter(category=instance))
+
+
+@receiver(pre_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    touch(Title.objects.filter(category=instance))
+
+
+@receiver(post_save, sender=Genre)
+def genre_saved(sender, instance, created, **kwargs):
+    if not created:
+        touch(Title.objects.filter(genre=instance))
+
+
+@receiver(pre_delete, sender=Genre)
+def genre_deleted(sender, instance, **kwargs):
+    touch(Title.objects.filter(genre=instance))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        touch(Title.objects.filter(pk=instance.pk))
+    elif pk_set is None:
+        touch(Title.objects.filter(genre=instance))
+    else:
+        touch(Title.objects.filter(pk__in=pk_set))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_ranked(sender, instance, action, reverse, pk_set,
+                        **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        ratings.rebuild_rankings(Title.objects.filter(pk=instance.pk))
+    elif pk_set is None:
+        TitleGenreRanking.objects.filter(genre=instance).delete()
+    else:
+        ratings.rebuild_rankings(Title.objects.filter(pk__in=pk_set))
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    loaded_username = getattr(instance, '_loaded_username', None)
+    if created or loaded_username == instance.username:
+        return
+    touch(Review.objects.filter(author=instance))
+    touch(Comment.objects.filter(author=instance))
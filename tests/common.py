@@ -113,3 +113,39 @@ def create_comments(admin_client, admin):
     result.append({'id': create_comment(client_moderator, titles[0]["id"], reviews[0]["id"], 'qwerty321'),
                    'author': moderator.username, 'text': 'qwerty321'})
     return result, reviews, titles, user, moderator
+
+
+def create_content(review_counts=(3, 0, 0), comment_counts=(1, 1, 1)):
+    """
+    Titles, reviews and comments created with the ORM, with texts which
+    have to be escaped in JSON and CSV.
+    Title i has the category and the first i genres, except title 0,
+    which has no category. It is reviewed by the first review_counts[i]
+    readers. Review j of title 0 gets comment_counts[j] comments, one
+    from each of the first readers.
+    """
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    category = Category.objects.create(name='Фильмы', slug='films')
+    genres = [Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+              for i in range(len(review_counts) - 1)]
+    readers = [get_user_model().objects.create(
+        username=f'reader{i}', email=f'reader{i}@yamdb.fake')
+        for i in range(max(max(review_counts), max(comment_counts)))]
+    titles, reviews = [], []
+    for i, count in enumerate(review_counts):
+        title = Title.objects.create(
+            name=f'Фильм {i}, "quoted"', year=2000 + i,
+            description='Line\nbreak separated text \\ tab\t',
+            category=category if i else None)
+        title.genre.set(genres[:i])
+        titles.append(title)
+        reviews.extend(
+            Review.objects.create(
+                title=title, author=reader, text=f'Отзыв {j} \U0001F600',
+                score=j + 4)
+            for j, reader in enumerate(readers[:count]))
+    for review, count in zip(reviews[:review_counts[0]], comment_counts):
+        for reader in readers[:count]:
+            Comment.objects.create(review=review, author=reader, text='Ok ')
+    return titles, reviews
@@ -0,0 +1,111 @@
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_reviews
+
+
+class Test08TitleRating:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == 200
+        return response.json().get('rating')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_follows_reviews(self, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title_id = titles[0]['id']
+        assert self.get_rating(admin_client, title_id) == 4, (
+            'Check that the stored rating is updated when a review is created'
+        )
+        assert self.get_rating(admin_client, titles[1]['id']) is None, (
+            'Check that a title without reviews has no rating'
+        )
+
+        response = auth_client(user).patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[1]["id"]}/',
+            data={'score': 9}
+        )
+        assert response.status_code == 200
+        assert self.get_rating(admin_client, title_id) == 6, (
+            'Check that the stored rating is updated when a score is changed'
+        )
+
+        response = admin_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/'
+        )
+        assert response.status_code == 204
+        assert self.get_rating(admin_client, title_id) == 6, (
+            'Check that the stored rating is updated when a review is deleted'
+        )
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        assert self.get_rating(admin_client, title_id) == 4, (
+            'Check that the stored rating is updated when the author of '
+            'a review is deleted'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_ratings(self, admin_client, admin):
+        from reviews.models import Title
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        Title.objects.update(rating_sum=100, review_count=1)
+        call_command('rebuild_ratings')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.review_count) == (12, 3), (
+            'Check that `rebuild_ratings` recalculates ratings from reviews'
+        )
+        title = Title.objects.get(pk=titles[1]['id'])
+        assert (title.rating_sum, title.review_count) == (0, 0), (
+            'Check that `rebuild_ratings` resets ratings of titles '
+            'without reviews'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rating_stats(self, client, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/rating-stats/'
+        response = client.get(url)
+        assert response.status_code == 200
+        histogram = [0] * 11
+        histogram[3] = histogram[4] = histogram[5] = 1
+        assert response.json() == {
+            'count': 3, 'mean': 4.0, 'median': 4.0, 'histogram': histogram
+        }, 'Check the scores distribution of `rating-stats`'
+
+        auth_client(user).patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[1]["id"]}/',
+            data={'score': 9})
+        admin_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/')
+        histogram = [0] * 11
+        histogram[4] = histogram[9] = 1
+        assert client.get(url).json() == {
+            'count': 2, 'mean': 6.5, 'median': 6.5, 'histogram': histogram
+        }, 'Check that the score counts follow edited and deleted reviews'
+
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/'
+                              'rating-stats/')
+        assert response.json() == {
+            'count': 0, 'mean': None, 'median': None, 'histogram': [0] * 11
+        }
+        response = client.get('/api/v1/titles/0/rating-stats/')
+        assert response.status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_rebuild_score_counts(self, client, admin_client, admin):
+        from reviews.models import TitleScoreCount
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/rating-stats/'
+        expected = client.get(url).json()
+        TitleScoreCount.objects.update(count=50)
+        call_command('rebuild_ratings')
+        assert client.get(url).json() == expected, (
+            'Check that `rebuild_ratings` recounts the scores of titles'
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert not TitleScoreCount.objects.exists()
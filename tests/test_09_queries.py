@@ -0,0 +1,127 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def create_catalogue(titles_count, genres_count, prefix):
+    from reviews.models import Category, Genre, Title
+
+    category = Category.objects.create(name=prefix, slug=prefix)
+    genres = [
+        Genre.objects.create(name=f'{prefix} {i}', slug=f'{prefix}-{i}')
+        for i in range(genres_count)
+    ]
+    titles = []
+    for i in range(titles_count):
+        title = Title.objects.create(
+            name=f'{prefix} {i}', year=2000, description='Text',
+            category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    return titles
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+class Test09QueryCount:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_list_queries(self, client):
+        create_catalogue(titles_count=1, genres_count=1, prefix='small')
+        small_page = count_queries(client, '/api/v1/titles/?limit=20')
+        create_catalogue(titles_count=10, genres_count=4, prefix='big')
+        big_page = count_queries(client, '/api/v1/titles/?limit=20')
+        assert small_page == big_page, (
+            'Check that the number of queries of `/api/v1/titles/` '
+            'does not depend on the number of titles and genres on the page'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_detail_queries(self, client):
+        title, = create_catalogue(titles_count=1, genres_count=1,
+                                  prefix='small')
+        one_genre = count_queries(client, f'/api/v1/titles/{title.id}/')
+        for i in range(3):
+            title.genre.create(name=f'Extra {i}', slug=f'extra-{i}')
+        many_genres = count_queries(client, f'/api/v1/titles/{title.id}/')
+        assert one_genre == many_genres, (
+            'Check that the number of queries of `/api/v1/titles/{title_id}/` '
+            'does not depend on the number of genres'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_review_create_loads_title_once(self, admin_client):
+        title, = create_catalogue(titles_count=1, genres_count=1,
+                                  prefix='small')
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                f'/api/v1/titles/{title.id}/reviews/',
+                data={'text': 'Text', 'score': 5})
+        assert response.status_code == 201
+        title_lookups = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_title"' in query['sql']
+        ]
+        assert len(title_lookups) == 1, (
+            'Check that `POST /api/v1/titles/{title_id}/reviews/` '
+            'loads the title only once'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_comment_routes_check_title(self, client, admin_client):
+        first, second = create_catalogue(titles_count=2, genres_count=1,
+                                         prefix='small')
+        response = admin_client.post(
+            f'/api/v1/titles/{first.id}/reviews/',
+            data={'text': 'Text', 'score': 5})
+        review_id = response.json()['id']
+        url = f'/api/v1/titles/{first.id}/reviews/{review_id}/comments/'
+        assert client.get(url).status_code == 200
+        wrong_url = (
+            f'/api/v1/titles/{second.id}/reviews/{review_id}/comments/')
+        assert client.get(wrong_url).status_code == 404, (
+            'Check that the comments of a review are not available '
+            'under another title'
+        )
+        response = admin_client.post(wrong_url, data={'text': 'Text'})
+        assert response.status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_review_and_comment_list_queries(self, client):
+        from reviews.models import Comment, Review, User
+
+        title, = create_catalogue(titles_count=1, genres_count=1,
+                                  prefix='small')
+        users = [
+            User.objects.create(username=f'reader{i}',
+                                email=f'reader{i}@yamdb.fake')
+            for i in range(5)
+        ]
+        review = Review.objects.create(
+            title=title, author=users[0], text='Text', score=5)
+        Comment.objects.create(review=review, author=users[0], text='Text')
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        comments_url = f'{reviews_url}{review.id}/comments/'
+        one_review = count_queries(client, reviews_url)
+        one_comment = count_queries(client, comments_url)
+        for user in users[1:]:
+            Review.objects.create(
+                title=title, author=user, text='Text', score=5)
+            Comment.objects.create(review=review, author=user, text='Text')
+        assert count_queries(client, reviews_url) == one_review, (
+            'Check that the number of queries of '
+            '`/api/v1/titles/{title_id}/reviews/` does not depend on '
+            'the number of reviews'
+        )
+        assert count_queries(client, comments_url) == one_comment, (
+            'Check that the number of queries of '
+            '`/api/v1/titles/{title_id}/reviews/{review_id}/comments/` '
+            'does not depend on the number of comments'
+        )
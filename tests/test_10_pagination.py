@@ -0,0 +1,100 @@
+import pytest
+
+from .common import create_comments, create_titles
+
+
+def walk_cursor_pages(client, url):
+    ids = []
+    response = client.get(url)
+    while True:
+        assert response.status_code == 200
+        data = response.json()
+        assert 'count' not in data, (
+            'Check that cursor pages do not count the whole list'
+        )
+        ids.extend(item['id'] for item in data['results'])
+        if not data['next']:
+            return ids
+        response = client.get(data['next'])
+
+
+class Test10CursorPagination:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cursor(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        for i in range(3):
+            response = admin_client.post('/api/v1/titles/', data={
+                'name': f'Title {i}', 'year': 2000,
+                'category': 'films', 'description': 'Text'
+            })
+            titles.append(response.json())
+        ids = walk_cursor_pages(client, '/api/v1/titles/?cursor=&limit=2')
+        assert ids == sorted(title['id'] for title in titles), (
+            'Check that `/api/v1/titles/?cursor=` walks all titles by `id`'
+        )
+        response = client.get('/api/v1/titles/')
+        assert response.json()['count'] == len(titles), (
+            'Check that `/api/v1/titles/` without `cursor` keeps '
+            'limit/offset pagination'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_and_comments_cursor(self, client, admin_client,
+                                            admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id = titles[0]['id']
+        ids = walk_cursor_pages(
+            client, f'/api/v1/titles/{title_id}/reviews/?cursor=&limit=2'
+        )
+        assert ids == [review['id'] for review in reversed(reviews)], (
+            'Check that `/api/v1/titles/{title_id}/reviews/?cursor=` '
+            'walks all reviews from the newest one'
+        )
+        ids = walk_cursor_pages(
+            client,
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/comments/'
+            '?cursor=&limit=2'
+        )
+        assert ids == [comment['id'] for comment in reversed(comments)], (
+            'Check that `/api/v1/titles/{title_id}/reviews/{review_id}/'
+            'comments/?cursor=` walks all comments from the newest one'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_cursor_equal_timestamps(self, client, admin_client, admin):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from django.utils import timezone
+        from reviews.models import Review
+
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        Review.objects.update(pub_date=timezone.now())
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/?cursor=&limit=1'
+        with CaptureQueriesContext(connection) as context:
+            ids = walk_cursor_pages(client, url)
+        assert ids == sorted(review['id'] for review in reviews)[::-1], (
+            'Check that cursor pages of reviews with the same `pub_date` '
+            'are ordered by `id` without gaps or repeats'
+        )
+        assert not any('OFFSET' in query['sql']
+                       for query in context.captured_queries), (
+            'Check that cursor pages position on (`pub_date`, `id`) '
+            'instead of skipping rows with OFFSET'
+        )
+        response = client.get(url)
+        response = client.get(client.get(response.json()['next']).json()[
+            'previous'])
+        assert [item['id'] for item in response.json()['results']] == (
+            ids[:1]), (
+            'Check that the `previous` link of a cursor page returns '
+            'the page before it'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_invalid_cursor(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/?cursor=cD14')
+        assert response.status_code == 404, (
+            'Check that a cursor with a malformed position returns 404'
+        )
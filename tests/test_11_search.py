@@ -0,0 +1,68 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test11TitleSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search_titles(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Drama school', 'year': 2001, 'category': 'films',
+            'description': 'Nothing special'
+        })
+        drama_school = response.json()
+
+        response = client.get('/api/v1/titles/?search=drama')
+        assert response.status_code == 200
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids == [drama_school['id'], titles[1]['id']], (
+            'Check that `/api/v1/titles/?search=` finds titles by name and '
+            'description and puts matches by name first'
+        )
+
+        response = client.get('/api/v1/titles/?search=STEEP di')
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids == [titles[0]['id']], (
+            'Check that `/api/v1/titles/?search=` ignores case and matches '
+            'word prefixes'
+        )
+
+        response = client.get('/api/v1/titles/?search="unknown')
+        assert response.status_code == 200
+        assert response.json()['count'] == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_search_follows_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        admin_client.patch(f'/api/v1/titles/{title_id}/',
+                           data={'name': 'Renamed'})
+        response = client.get('/api/v1/titles/?search=renamed')
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids == [title_id], (
+            'Check that the search index is updated when a title is changed'
+        )
+        admin_client.delete(f'/api/v1/titles/{title_id}/')
+        response = client.get('/api/v1/titles/?search=renamed')
+        assert response.json()['count'] == 0, (
+            'Check that deleted titles are removed from the search index'
+        )
+
+        response = client.get('/api/v1/titles/?name=Proj')
+        assert response.json()['count'] == 1, (
+            'Check that filtering by `name` keeps working'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_search_with_cursor(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/?search=project&cursor=')
+        assert response.status_code == 400, (
+            'Check that ranked search results are not paged by id with '
+            'a cursor'
+        )
+        assert 'cursor' in response.json()
+        response = client.get('/api/v1/titles/?search=&cursor=')
+        assert response.status_code == 200
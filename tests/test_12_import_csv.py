@@ -0,0 +1,66 @@
+import pytest
+from django.core.management import call_command
+
+
+class Test12ImportCsv:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_import_static_data(self, client):
+        from reviews.models import (Category, Comment, Genre, Review, Title,
+                                    User)
+
+        call_command('import_csv', batch_size=7)
+        assert Category.objects.count() == 3
+        assert Genre.objects.count() == 15
+        assert User.objects.count() == 5
+        assert Title.objects.count() == 32
+        assert Title.genre.through.objects.count() == 42
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Check that `import_csv` keeps publication dates from the file'
+        )
+        assert User.objects.get(username='capt_obvious').is_superuser
+
+        title = Title.objects.get(pk=1)
+        scores = title.reviews.values_list('score', flat=True)
+        assert title.rating_sum == sum(scores), (
+            'Check that `import_csv` rebuilds title ratings'
+        )
+        response = client.get('/api/v1/titles/?search=Шоушенка')
+        assert [item['id'] for item in response.json()['results']] == [1], (
+            'Check that `import_csv` rebuilds the search index'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reimport(self):
+        from io import StringIO
+
+        from reviews.models import Comment, Review, Title
+
+        call_command('import_csv', stdout=StringIO())
+        out = StringIO()
+        call_command('import_csv', stdout=out)
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        assert 'comments.csv: 0 rows' in out.getvalue(), (
+            'Check that `import_csv` skips the rows loaded by a previous run'
+        )
+        title = Title.objects.get(pk=1)
+        assert title.rating_sum == sum(
+            title.reviews.values_list('score', flat=True))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_conflicting_rows(self, tmp_path):
+        from django.core.management.base import CommandError
+
+        from reviews.models import Category
+
+        Category.objects.create(id=100, name='Films', slug='movie')
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n1,Фильм,movie\n', encoding='utf-8')
+        with pytest.raises(CommandError, match='category.csv'):
+            call_command('import_csv', path=str(tmp_path))
+        assert Category.objects.count() == 1
@@ -0,0 +1,53 @@
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+
+class Test13MailQueue:
+    url_signup = '/api/v1/auth/signup/'
+    data = {'email': 'queued@yamdb.fake', 'username': 'queued_user'}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_uses_outbox(self, client):
+        from reviews.models import OutgoingEmail
+
+        outbox_before_count = len(mail.outbox)
+        response = client.post(self.url_signup, data=self.data)
+        assert response.status_code == 200
+        assert len(mail.outbox) == outbox_before_count, (
+            'Check that signup does not send the email inside the request'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.to == self.data['email']
+
+        call_command('run_mail_worker', once=True)
+        assert len(mail.outbox) == outbox_before_count + 1
+        assert mail.outbox[-1].to == [self.data['email']]
+        email.refresh_from_db()
+        assert email.sent is not None, (
+            'Check that the worker marks delivered emails as sent'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_failed_delivery_is_retried_later(self, client):
+        from reviews.models import OutgoingEmail
+
+        client.post(self.url_signup, data=self.data)
+        with mock.patch('django.core.mail.EmailMessage.send',
+                        side_effect=OSError('Connection refused')):
+            call_command('run_mail_worker', once=True)
+        email = OutgoingEmail.objects.get()
+        assert email.sent is None
+        assert email.attempts == 1
+        assert email.last_error == 'Connection refused'
+
+        outbox_before_count = len(mail.outbox)
+        call_command('run_mail_worker', once=True)
+        assert len(mail.outbox) == outbox_before_count, (
+            'Check that a failed email waits for the backoff delay'
+        )
+        OutgoingEmail.objects.update(next_attempt=email.created)
+        call_command('run_mail_worker', once=True)
+        assert len(mail.outbox) == outbox_before_count + 1
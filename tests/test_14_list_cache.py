@@ -0,0 +1,79 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class Test14ListCache:
+
+    def check_cached_list(self, client, admin_client, url, model):
+        admin_client.post(url, data={'name': 'First', 'slug': 'first'})
+        response = client.get(url)
+        assert response.json()['count'] == 1
+
+        with CaptureQueriesContext(connection) as context:
+            cached = client.get(url)
+        assert cached.json() == response.json()
+        assert len(context.captured_queries) == 0, (
+            f'Check that a repeated GET request to `{url}` is served '
+            'from the cache'
+        )
+
+        response = client.get(f'{url}?search=Sec')
+        assert response.json()['count'] == 0
+        model.objects.create(name='Second', slug='second')
+        response = client.get(url)
+        assert response.json()['count'] == 2, (
+            f'Check that saving a model invalidates the cached `{url}`'
+        )
+        response = client.get(f'{url}?search=Sec')
+        assert response.json()['count'] == 1, (
+            f'Check that the cache of `{url}` depends on the query string'
+        )
+
+        admin_client.delete(f'{url}second/')
+        response = client.get(url)
+        assert response.json()['count'] == 1, (
+            f'Check that deleting an object invalidates the cached `{url}`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_categories(self, client, admin_client):
+        from reviews.models import Category
+
+        self.check_cached_list(
+            client, admin_client, '/api/v1/categories/', Category)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_genres_file_cache(self, client, admin_client, settings,
+                                  tmp_path):
+        from reviews.models import Genre
+
+        settings.CACHES = {
+            'default': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': str(tmp_path),
+            }
+        }
+        self.check_cached_list(
+            client, admin_client, '/api/v1/genres/', Genre)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_import_invalidates(self, client):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        for url in ('/api/v1/categories/', '/api/v1/genres/'):
+            assert client.get(url).json()['count'] == 0
+        assert client.get('/api/v1/titles/autocomplete/?q=Побег').json() == []
+        call_command('import_csv', stdout=StringIO())
+        assert client.get('/api/v1/categories/').json()['count'] == 3, (
+            'Check that `import_csv` invalidates the cached categories'
+        )
+        assert client.get('/api/v1/genres/').json()['count'] == 15, (
+            'Check that `import_csv` invalidates the cached genres'
+        )
+        assert client.get('/api/v1/titles/autocomplete/?q=Побег').json(), (
+            'Check that imported titles are suggested'
+        )
@@ -0,0 +1,107 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_comments
+
+
+class Test15ConditionalGet:
+
+    def check_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response['ETag']
+        assert response.has_header('Last-Modified'), (
+            f'Check that GET `{url}` returns `Last-Modified`'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            f'Check that GET `{url}` with a matching `If-None-Match` '
+            'returns status 304'
+        )
+        assert response['ETag'] == etag
+        assert len(context.captured_queries) <= 2, (
+            f'Check that a 304 response of `{url}` does not load the objects'
+        )
+        return etag
+
+    def check_modified(self, client, url, etag):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f'Check that `{url}` returns 200 once the data has changed'
+        )
+        assert response['ETag'] != etag
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles(self, client, admin_client, admin):
+        from reviews.models import Genre
+
+        _, reviews, titles, user, _ = create_comments(admin_client, admin)
+        title_id = titles[0]['id']
+        list_url = '/api/v1/titles/'
+        detail_url = f'/api/v1/titles/{title_id}/'
+        list_etag = self.check_not_modified(client, list_url)
+        detail_etag = self.check_not_modified(client, detail_url)
+
+        auth_client(user).patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[1]["id"]}/',
+            data={'score': 10}
+        )
+        self.check_modified(client, detail_url, detail_etag)
+        self.check_modified(client, list_url, list_etag)
+
+        list_etag = self.check_not_modified(client, list_url)
+        genre = Genre.objects.get(slug=titles[0]['genre'][0])
+        genre.name = 'Renamed'
+        genre.save()
+        self.check_modified(client, list_url, list_etag)
+
+        list_etag = self.check_not_modified(client, list_url)
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        self.check_modified(client, list_url, list_etag)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_and_comments(self, client, admin_client, admin):
+        comments, reviews, titles, user, _ = create_comments(
+            admin_client, admin)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        review_url = f'{reviews_url}{reviews[1]["id"]}/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        comment_url = f'{comments_url}{comments[1]["id"]}/'
+        reviews_etag = self.check_not_modified(client, reviews_url)
+        review_etag = self.check_not_modified(client, review_url)
+        comments_etag = self.check_not_modified(client, comments_url)
+        comment_etag = self.check_not_modified(client, comment_url)
+
+        admin_client.patch(f'/api/v1/users/{user.username}/',
+                           data={'username': 'RenamedUser'})
+        self.check_modified(client, reviews_url, reviews_etag)
+        self.check_modified(client, review_url, review_etag)
+        self.check_modified(client, comments_url, comments_etag)
+        self.check_modified(client, comment_url, comment_etag)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_cursor_pages(self, client, admin_client, admin):
+        _, reviews, titles, user, moderator = create_comments(
+            admin_client, admin)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        urls = (f'{reviews_url}?cursor=&limit=2', '/api/v1/titles/?cursor=')
+        for url in urls:
+            with CaptureQueriesContext(connection) as context:
+                self.check_not_modified(client, url)
+            assert not any(
+                'COUNT(' in query['sql'] or 'MAX(' in query['sql']
+                for query in context.captured_queries), (
+                f'Check that `{url}` does not aggregate the whole list'
+            )
+
+        url = urls[0]
+        etag = self.check_not_modified(client, url)
+        auth_client(moderator).patch(
+            f'{reviews_url}{reviews[2]["id"]}/', data={'text': 'Changed'})
+        self.check_modified(client, url, etag)
+
+        etag = self.check_not_modified(client, url)
+        admin_client.delete(f'{reviews_url}{reviews[2]["id"]}/')
+        self.check_modified(client, url, etag)
@@ -0,0 +1,45 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test16RequestMetrics:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_debug_headers(self, client, admin_client, settings):
+        create_titles(admin_client)
+        settings.DEBUG = True
+        response = client.get('/api/v1/titles/')
+        assert int(response['X-Query-Count']) > 0, (
+            'Check that in debug mode responses report the number of queries'
+        )
+        timings = response['Server-Timing']
+        for name in ('sql', 'serializer', 'total'):
+            assert f'{name};dur=' in timings
+
+        settings.DEBUG = False
+        response = client.get('/api/v1/titles/')
+        assert not response.has_header('X-Query-Count')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_prometheus_endpoint(self, client, admin_client, user_client):
+        from api.metrics import registry
+
+        registry.clear()
+        create_titles(admin_client)
+        client.get('/api/v1/titles/')
+        response = admin_client.get('/api/v1/metrics/')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        assert 'yamdb_requests_total{route="api:titles-list"}' in text, (
+            'Check that metrics are labelled by the route name'
+        )
+        assert 'yamdb_db_queries_total{route="api:titles-list"}' in text
+        assert ('yamdb_request_duration_seconds_count'
+                '{route="api:titles-list"}') in text
+
+        assert client.get('/api/v1/metrics/').status_code == 401
+        assert user_client.get('/api/v1/metrics/').status_code == 403, (
+            'Check that only administrators can read the metrics'
+        )
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+
+class Test17Benchmark:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_generate_and_benchmark(self, tmp_path):
+        from reviews.models import Comment, Review, Title, User
+
+        call_command('generate_data', scale='tiny', batch_size=64)
+        assert User.objects.count() == 50
+        assert Title.objects.count() == 100
+        assert 0 < Review.objects.count() <= 600
+        assert Comment.objects.exists()
+        title = Title.objects.order_by('-review_count').first()
+        assert title.review_count == title.reviews.count(), (
+            'Check that `generate_data` rebuilds the title ratings'
+        )
+
+        output = tmp_path / 'results.json'
+        reviews_count = Review.objects.count()
+        call_command('benchmark', repeat=2, warmup=0, output=str(output))
+        results = json.loads(output.read_text())
+        for name in ('title_list', 'review_list', 'comment_list',
+                     'signup_token', 'review_create'):
+            assert results['scenarios'][name]['runs'] == 2
+        assert results['scenarios']['review_create']['status'] == 201
+        assert results['scenarios']['signup_token']['status'] == 200
+        assert Review.objects.count() == reviews_count, (
+            'Check that scenarios which write roll their changes back'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_repeated_signup_and_status(self, monkeypatch):
+        from django.core.management.base import CommandError
+
+        from api.benchmarks import SCENARIOS
+
+        call_command('generate_data', scale='tiny', batch_size=64)
+        call_command('benchmark', 'signup_token', repeat=12)
+        func, writes, _ = SCENARIOS['title_list']
+        monkeypatch.setitem(SCENARIOS, 'title_list', (func, writes, 201))
+        with pytest.raises(CommandError, match='title_list returned status'):
+            call_command('benchmark', 'title_list', repeat=1)
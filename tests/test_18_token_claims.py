@@ -0,0 +1,87 @@
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+def claims_client(user):
+    from api.authentication import ClaimsRefreshToken
+
+    token = ClaimsRefreshToken.for_user(user).access_token
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def user_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    queries = [query['sql'] for query in context.captured_queries
+               if 'FROM "reviews_user"' in query['sql']]
+    return response, queries
+
+
+class Test18TokenClaims:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_token_carries_claims(self, client, admin):
+        client.post('/api/v1/auth/signup/', data={
+            'username': 'claimsuser', 'email': 'claims@yamdb.fake'})
+        from reviews.models import User
+
+        user = User.objects.get(username='claimsuser')
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == 200
+        token = AccessToken(response.json()['access_token'])
+        for claim, value in (('username', 'claimsuser'), ('role', 'user'),
+                             ('is_staff', False), ('is_superuser', False)):
+            assert token[claim] == value, (
+                f'Check that the access token carries the `{claim}` claim'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_no_user_query(self, admin):
+        client = claims_client(admin)
+        response, _ = user_queries(client, '/api/v1/users/me/')
+        assert response.status_code == 200
+        response, queries = user_queries(client, '/api/v1/titles/')
+        assert response.status_code == 200
+        assert not queries, (
+            'Check that a request with a claims token does not load the user'
+        )
+        response = client.post('/api/v1/categories/', data={
+            'name': 'Films', 'slug': 'films'})
+        assert response.status_code == 201, (
+            'Check that permissions are checked with the role claim'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_role_change_revokes_token(self, admin):
+        client = claims_client(admin)
+        assert client.get('/api/v1/users/').status_code == 200
+        admin.first_name = 'Renamed'
+        admin.save()
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Check that changing fields outside the claims keeps the token'
+        )
+        admin.role = admin.USER
+        admin.is_superuser = False
+        admin.save()
+        assert client.get('/api/v1/users/').status_code == 401, (
+            'Check that changing the role revokes issued tokens'
+        )
+        assert claims_client(admin).get('/api/v1/users/').status_code == 403
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_deleted_user_token(self, user):
+        client = claims_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        user.delete()
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Check that tokens of a deleted user are rejected'
+        )
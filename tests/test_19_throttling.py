@@ -0,0 +1,86 @@
+import pytest
+
+
+class Test19AuthThrottling:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_identity_bucket(self, client, monkeypatch):
+        from api.throttling import AuthIdentityThrottle
+
+        monkeypatch.setattr(
+            AuthIdentityThrottle, 'rate', '2/min', raising=False)
+        data = {'username': 'missing_user', 'confirmation_code': '1'}
+        for _ in range(2):
+            response = client.post('/api/v1/auth/token/', data=data)
+            assert response.status_code == 404
+        response = client.post('/api/v1/auth/token/', data=data)
+        assert response.status_code == 429, (
+            'Check that `/api/v1/auth/token/` limits requests per username'
+        )
+        assert int(response['Retry-After']) > 0
+        data['username'] = 'other_user'
+        response = client.post('/api/v1/auth/token/', data=data)
+        assert response.status_code == 404, (
+            'Check that buckets of other usernames are not affected'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_bucket_refills(self, client, monkeypatch):
+        from api.throttling import AuthIPThrottle
+
+        now = [1000.0]
+        monkeypatch.setattr(
+            AuthIPThrottle, 'rate', '2/min', raising=False)
+        monkeypatch.setattr(AuthIPThrottle, 'timer', lambda self: now[0])
+        for _ in range(2):
+            response = client.post('/api/v1/auth/signup/', data={})
+            assert response.status_code == 400
+        response = client.post('/api/v1/auth/signup/', data={})
+        assert response.status_code == 429, (
+            'Check that `/api/v1/auth/signup/` limits requests per address'
+        )
+        assert response['Retry-After'] == '30'
+        now[0] += 30
+        response = client.post('/api/v1/auth/signup/', data={})
+        assert response.status_code == 400, (
+            'Check that the bucket refills over time'
+        )
+        response = client.post('/api/v1/auth/signup/', data={})
+        assert response.status_code == 429
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rejected_before_db(self, client, monkeypatch):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from api.throttling import AuthIPThrottle
+
+        monkeypatch.setattr(
+            AuthIPThrottle, 'rate', '1/min', raising=False)
+        data = {'username': 'some_user', 'email': 'some@yamdb.fake'}
+        client.post('/api/v1/auth/signup/', data=data)
+        with CaptureQueriesContext(connection) as context:
+            response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == 429
+        assert not context.captured_queries, (
+            'Check that throttled requests do not touch the database'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_forwarded_for_ignored(self, client, monkeypatch):
+        from api.throttling import AuthIPThrottle
+
+        monkeypatch.setattr(
+            AuthIPThrottle, 'rate', '2/min', raising=False)
+        for number in range(2):
+            response = client.post(
+                '/api/v1/auth/signup/', data={},
+                HTTP_X_FORWARDED_FOR=f'10.0.0.{number}')
+            assert response.status_code == 400
+        response = client.post(
+            '/api/v1/auth/signup/', data={},
+            HTTP_X_FORWARDED_FOR='10.0.0.2')
+        assert response.status_code == 429, (
+            'Check that a client cannot get a new address bucket '
+            'by sending another `X-Forwarded-For` header'
+        )
@@ -0,0 +1,90 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_categories, create_genre
+
+
+class Test20TitlesBulk:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_bulk_create(self, client, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = [
+            {'name': f'Bulk {i}', 'year': 1990 + i, 'description': 'Text',
+             'genre': [genres[0]['slug'], genres[i % 3]['slug']],
+             'category': categories[i % 2]['slug']}
+            for i in range(30)
+        ]
+        data[3]['genre'] = ['missing']
+        data[7]['year'] = 3000
+        data[9]['category'] = 'missing'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                '/api/v1/titles/bulk/', data=data, format='json')
+        assert response.status_code == 201
+        assert len(context.captured_queries) < 20, (
+            'Check that `/api/v1/titles/bulk/` runs a fixed number of queries'
+        )
+        body = response.json()
+        assert [error['index'] for error in body['errors']] == [3, 7, 9], (
+            'Check that invalid titles are reported by their position'
+        )
+        assert 'genre' in body['errors'][0]['errors']
+        assert 'year' in body['errors'][1]['errors']
+        assert 'category' in body['errors'][2]['errors']
+        assert len(body['created']) == 27
+
+        created = body['created'][0]
+        response = client.get(f'/api/v1/titles/{created["id"]}/')
+        assert response.status_code == 200
+        title = response.json()
+        assert title['name'] == 'Bulk 0'
+        assert [genre['slug'] for genre in title['genre']] == ['horror']
+        assert title['category']['slug'] == categories[0]['slug']
+        response = client.get('/api/v1/titles/?search=Bulk')
+        assert response.json()['count'] == 27, (
+            'Check that created titles are added to the search index'
+        )
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Single', 'year': 2000, 'description': 'Text',
+            'category': categories[0]['slug']})
+        assert response.status_code == 201
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_bulk_invalid(self, admin_client, user_client):
+        response = admin_client.post(
+            '/api/v1/titles/bulk/', data={'name': 'One'}, format='json')
+        assert response.status_code == 400
+        response = admin_client.post(
+            '/api/v1/titles/bulk/',
+            data=[{'name': 'No year', 'category': 'none'}], format='json')
+        assert response.status_code == 400
+        assert response.json()['created'] == []
+        response = user_client.post(
+            '/api/v1/titles/bulk/', data=[], format='json')
+        assert response.status_code == 403
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_deleted_ids_not_reused(self, admin_client):
+        from reviews.models import Title
+
+        create_categories(admin_client)
+        titles = [Title.objects.create(name=f'Old {i}', year=2000,
+                                       description='Text')
+                  for i in range(2)]
+        for title in titles:
+            admin_client.delete(f'/api/v1/titles/{title.id}/')
+        response = admin_client.post('/api/v1/titles/bulk/', data=[
+            {'name': 'New', 'year': 2000, 'description': 'Text',
+             'category': 'films'}], format='json')
+        assert response.status_code == 201
+        created_id = response.json()['created'][0]['id']
+        assert created_id > titles[-1].id, (
+            'Check that `/api/v1/titles/bulk/` does not reuse the ids '
+            'of deleted titles'
+        )
+        title = Title.objects.create(name='Next', year=2000,
+                                     description='Text')
+        assert title.id > created_id
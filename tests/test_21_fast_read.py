@@ -0,0 +1,68 @@
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from .common import create_content
+
+
+class Test21FastReadPath:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_byte_identical(self, client, settings):
+        titles, reviews = create_content()
+        review = reviews[-1]
+        prefix = f'/api/v1/titles/{titles[0].id}/reviews/'
+        urls = (
+            '/api/v1/titles/',
+            '/api/v1/titles/?limit=2&offset=1',
+            '/api/v1/titles/?cursor=&limit=2',
+            '/api/v1/titles/?genre=genre-1',
+            '/api/v1/titles/?search=Фильм',
+            f'/api/v1/titles/{titles[0].id}/',
+            f'/api/v1/titles/{titles[1].id}/',
+            prefix,
+            f'{prefix}?cursor=&limit=2',
+            f'{prefix}{review.id}/',
+            f'{prefix}{review.id}/comments/',
+            f'{prefix}{review.id}/comments/?limit=1',
+        )
+        for url in urls:
+            settings.FAST_READ_PATH = True
+            fast = client.get(url)
+            settings.FAST_READ_PATH = False
+            slow = client.get(url)
+            assert fast.status_code == slow.status_code == 200
+            expected = JSONRenderer().render(
+                slow.data, 'application/json', {})
+            assert slow.content == expected
+            assert fast.content == expected, (
+                f'Check that `{url}` renders the same bytes on the fast path'
+            )
+        settings.FAST_READ_PATH = True
+        results = client.get('/api/v1/titles/').data['results']
+        assert type(results[0]) is dict, (
+            'Check that the title list is built without serializers'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_fallbacks(self, client):
+        titles, _ = create_content()
+        url = f'/api/v1/titles/{titles[0].id}/'
+        response = client.get(url, HTTP_ACCEPT='application/json; indent=4')
+        assert response.status_code == 200
+        assert response.content.startswith(b'{\n    "id"'), (
+            'Check that indented output is still supported'
+        )
+        response = client.get(url, HTTP_ACCEPT='text/html')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/html')
+        assert client.get('/api/v1/titles/0/').status_code == 404
+
+    def test_03_renderer(self):
+        from datetime import datetime
+
+        from api.renderers import FastJSONRenderer
+
+        for data in ({'date': datetime(2020, 1, 2, 3, 4, 5, 678901)},
+                     {1: 'integer key'}, [None, True, 'a b', 10 ** 30]):
+            assert (FastJSONRenderer().render(data)
+                    == JSONRenderer().render(data))
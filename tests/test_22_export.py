@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+from .common import create_content
+
+
+def ndjson(text):
+    # Only \n separates the records, str.splitlines would also split
+    # on the U+2028 kept unescaped in the strings.
+    return [json.loads(line) for line in text.split('\n') if line]
+
+
+def streamed(response):
+    assert response.status_code == 200
+    assert response.streaming, 'Check that the export is streamed'
+    return b''.join(response.streaming_content).decode()
+
+
+class Test22Export:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_ndjson(self, admin_client, settings):
+        settings.EXPORT_CHUNK_SIZE = 2
+        titles, reviews = create_content()
+        response = admin_client.get('/api/v1/export/titles/')
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        rows = ndjson(streamed(response))
+        assert [row['id'] for row in rows] == [title.id for title in titles]
+        assert rows[0]['category'] is None
+        assert rows[2]['genre'] == ['genre-0', 'genre-1']
+        assert rows[0]['rating'] == 5
+        assert rows[1]['rating'] is None
+
+        rows = ndjson(streamed(admin_client.get('/api/v1/export/comments/')))
+        assert len(rows) == 3
+        assert rows[0] == {
+            'id': reviews[0].comments.get().id, 'title_id': titles[0].id,
+            'review_id': reviews[0].id, 'author': 'reader0', 'text': 'Ok ',
+            'pub_date': rows[0]['pub_date'], 'updated': rows[0]['updated'],
+        }
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_csv_and_updated_since(self, admin_client):
+        from reviews.models import Title
+
+        titles, reviews = create_content()
+        response = admin_client.get('/api/v1/export/reviews/?fmt=csv')
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(streamed(response))))
+        assert len(rows) == 3
+        assert rows[0]['author'] == 'reader0'
+        assert rows[0]['text'] == reviews[0].text
+        assert rows[0]['score'] == '4'
+
+        rows = list(csv.DictReader(io.StringIO(streamed(admin_client.get(
+            '/api/v1/export/titles/?fmt=csv')))))
+        assert rows[0]['name'] == titles[0].name
+        assert rows[0]['description'] == titles[0].description
+        assert rows[2]['genre'] == 'genre-0,genre-1'
+
+        since = Title.objects.get(pk=titles[1].pk).updated
+        Title.objects.filter(pk=titles[0].pk).update(
+            updated='2000-01-01T00:00:00Z')
+        response = admin_client.get(
+            '/api/v1/export/titles/',
+            {'updated_since': since.isoformat()})
+        ids = [row['id'] for row in ndjson(streamed(response))]
+        assert titles[0].id not in ids, (
+            'Check that `updated_since` skips rows changed before it'
+        )
+        assert titles[1].id in ids
+        response = admin_client.get(
+            '/api/v1/export/titles/?updated_since=yesterday')
+        assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_access(self, client, user_client, admin_client):
+        assert client.get('/api/v1/export/titles/').status_code == 401
+        assert user_client.get('/api/v1/export/titles/').status_code == 403
+        assert admin_client.get('/api/v1/export/users/').status_code == 404
+        response = admin_client.get('/api/v1/export/titles/?fmt=xml')
+        assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_command(self, tmp_path):
+        titles, _ = create_content()
+        output = tmp_path / 'titles.csv'
+        call_command('export', 'titles', format='csv', output=str(output))
+        with open(output, encoding='utf-8', newline='') as file:
+            rows = list(csv.DictReader(file))
+        assert [int(row['id']) for row in rows] == [
+            title.id for title in titles]
+        stdout = io.StringIO()
+        call_command('export', 'reviews', updated_since='2000-01-01',
+                     stdout=stdout)
+        rows = ndjson(stdout.getvalue())
+        assert [row['author'] for row in rows] == [
+            'reader0', 'reader1', 'reader2']
@@ -0,0 +1,107 @@
+import pytest
+from django.db import connection
+
+
+def create_board():
+    from reviews.models import Category, Genre, Review, Title, User
+
+    films = Category.objects.create(name='Films', slug='films')
+    books = Category.objects.create(name='Books', slug='books')
+    drama = Genre.objects.create(name='Drama', slug='drama')
+    comedy = Genre.objects.create(name='Comedy', slug='comedy')
+    users = [User.objects.create(username=f'critic{i}',
+                                 email=f'critic{i}@yamdb.fake')
+             for i in range(3)]
+    titles = {}
+    for name, category, genres, scores in (
+            ('Good', films, [drama], [8, 9]),
+            ('Best', films, [drama, comedy], [10]),
+            ('Bad', books, [drama], [2, 3, 4]),
+            ('Funny', books, [comedy], [7, 7, 7]),
+            ('Unrated', films, [drama], [])):
+        title = Title.objects.create(
+            name=name, year=2000, description='Text', category=category)
+        title.genre.set(genres)
+        for user, score in zip(users, scores):
+            Review.objects.create(
+                title=title, author=user, text='Text', score=score)
+        titles[name] = title
+    return titles
+
+
+def top(client, query=''):
+    response = client.get(f'/api/v1/titles/top/{query}')
+    assert response.status_code == 200
+    return [title['name'] for title in response.json()]
+
+
+class Test23TopTitles:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_leaderboards(self, client):
+        create_board()
+        assert top(client, '?genre=drama') == ['Best', 'Good', 'Bad'], (
+            'Check that `/api/v1/titles/top/` orders a genre by rating'
+        )
+        assert top(client, '?genre=drama&min_reviews=2') == ['Good', 'Bad']
+        assert top(client, '?genre=comedy&category=books') == ['Funny']
+        assert top(client, '?category=films') == ['Best', 'Good']
+        assert top(client) == ['Best', 'Good', 'Funny', 'Bad']
+        assert top(client, '?limit=1') == ['Best']
+        assert top(client, '?genre=missing') == []
+        response = client.get('/api/v1/titles/top/?limit=many')
+        assert response.status_code == 400
+        response = client.get('/api/v1/titles/top/?genre=comedy')
+        assert response.json()[0] == client.get(
+            f'/api/v1/titles/{response.json()[0]["id"]}/').json(), (
+            'Check that leaderboards list titles like the title endpoints'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rankings_follow_changes(self, client):
+        from reviews.models import Category, Genre, Review, User
+
+        titles = create_board()
+        for review in Review.objects.filter(title=titles['Bad']):
+            review.score = 10
+            review.save()
+        assert top(client, '?genre=drama')[0] == 'Bad', (
+            'Check that leaderboards follow edited reviews'
+        )
+        user = User.objects.create(username='late', email='late@yamdb.fake')
+        Review.objects.create(
+            title=titles['Unrated'], author=user, text='Text', score=1)
+        assert top(client, '?genre=drama')[-1] == 'Unrated'
+        Review.objects.filter(title=titles['Unrated']).delete()
+        assert 'Unrated' not in top(client, '?genre=drama')
+
+        titles['Good'].genre.remove(Genre.objects.get(slug='drama'))
+        assert 'Good' not in top(client, '?genre=drama'), (
+            'Check that leaderboards follow genre changes'
+        )
+        Genre.objects.get(slug='comedy').title_set.add(titles['Good'])
+        assert 'Good' in top(client, '?genre=comedy')
+        titles['Good'].category = Category.objects.get(slug='books')
+        titles['Good'].save()
+        assert 'Good' in top(client, '?genre=comedy&category=books'), (
+            'Check that leaderboards follow category changes'
+        )
+        Genre.objects.get(slug='comedy').title_set.clear()
+        assert top(client, '?genre=comedy') == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_index_scan(self):
+        from reviews.models import TitleGenreRanking
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('The query plan is checked on SQLite only')
+        queryset = TitleGenreRanking.objects.filter(
+            genre_id=1, rating__isnull=False).order_by('-rating', '-title_id')
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        assert 'ranking_genre_rating_idx' in plan
+        assert 'TEMP B-TREE' not in plan, (
+            'Check that genre leaderboards are read in index order'
+        )
@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+from django.db import OperationalError, connections, transaction
+
+from api_yamdb.db import PROFILES, database_settings
+
+WRITERS = 8
+WRITES = 40
+
+
+def add_database(alias, path, profile):
+    connections.databases[alias] = database_settings(str(path), profile)
+    connections.ensure_defaults(alias)
+    connections.prepare_test_settings(alias)
+
+
+def run_writers(alias):
+    """Counter increments read then written in concurrent transactions."""
+    with connections[alias].cursor() as cursor:
+        cursor.execute(
+            'CREATE TABLE counter (id INTEGER PRIMARY KEY, value INTEGER)')
+        cursor.execute('INSERT INTO counter VALUES (1, 0)')
+    connections[alias].close()
+    errors = []
+    barrier = threading.Barrier(WRITERS)
+
+    def write():
+        barrier.wait()
+        for _ in range(WRITES):
+            try:
+                with transaction.atomic(using=alias):
+                    with connections[alias].cursor() as cursor:
+                        cursor.execute(
+                            'SELECT value FROM counter WHERE id = 1')
+                        value = cursor.fetchone()[0]
+                        cursor.execute(
+                            'UPDATE counter SET value = %s WHERE id = 1',
+                            [value + 1])
+            except OperationalError:
+                errors.append(1)
+        connections[alias].close()
+
+    threads = [threading.Thread(target=write) for _ in range(WRITERS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    with connections[alias].cursor() as cursor:
+        cursor.execute('SELECT value FROM counter WHERE id = 1')
+        value = cursor.fetchone()[0]
+    connections[alias].close()
+    return value, len(errors), elapsed
+
+
+@pytest.fixture
+def databases(tmp_path, django_db_blocker):
+    """Database files of both profiles outside of the test database."""
+    aliases = {'plain': 'development', 'tuned': 'production'}
+    for alias, profile in aliases.items():
+        add_database(alias, tmp_path / f'{alias}.sqlite3', profile)
+    with django_db_blocker.unblock():
+        yield
+        for alias in aliases:
+            connections[alias].close()
+    for alias in aliases:
+        del connections[alias]
+        del connections.databases[alias]
+
+
+class Test24SQLiteProfile:
+
+    def test_01_unknown_profile(self):
+        with pytest.raises(ValueError):
+            database_settings('db.sqlite3', 'staging')
+
+    def test_02_pragmas_applied(self, databases):
+        with connections['tuned'].cursor() as cursor:
+            for name, value in PROFILES['production']['PRAGMAS'].items():
+                cursor.execute(f'PRAGMA {name}')
+                applied = cursor.fetchone()[0]
+                if name == 'journal_mode':
+                    assert applied.upper() == value
+                elif name == 'synchronous':
+                    # NORMAL
+                    assert applied == 1
+                elif name == 'temp_store':
+                    # MEMORY
+                    assert applied == 2
+                else:
+                    assert applied == value, name
+        assert connections['tuned'].settings_dict['CONN_MAX_AGE'] > 0
+
+    def test_03_concurrent_writers(self, databases):
+        plain_value, plain_errors, plain_time = run_writers('plain')
+        tuned_value, tuned_errors, tuned_time = run_writers('tuned')
+        # Deferred transactions fail when two readers upgrade their locks,
+        # immediate ones wait for the writer within the busy timeout.
+        assert plain_errors > 0
+        assert plain_value == WRITERS * WRITES - plain_errors
+        assert tuned_errors == 0
+        assert tuned_value == WRITERS * WRITES
+        # Throughput in successful writes per second.
+        assert tuned_value / tuned_time > plain_value / plain_time
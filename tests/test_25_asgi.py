@@ -0,0 +1,201 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from django.core.handlers.wsgi import WSGIHandler
+
+from api.asgi import CatalogueApplication
+from api.loadtest import (
+    catalogue_paths, http_scope, request, request_paths, run_load)
+
+from .common import create_content
+
+
+def send_all(application, paths):
+    async def main():
+        return await asyncio.gather(
+            *(request(application, path) for path in paths))
+    return asyncio.run(main())
+
+
+class Test25ASGI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_same_responses(self, client):
+        titles, reviews = create_content()
+        review = reviews[-1]
+        application = CatalogueApplication(WSGIHandler(), workers=2)
+        served = []
+        get_response = application.get_response
+        application.get_response = lambda scope: served.append(
+            scope['path']) or get_response(scope)
+        prefix = f'/api/v1/titles/{titles[0].id}/reviews/'
+        paths = [
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            '/api/v1/titles/',
+            '/api/v1/titles/?limit=1&offset=1',
+            '/api/v1/titles/?genre=genre-0',
+            f'/api/v1/titles/{titles[0].id}/',
+            prefix,
+            f'{prefix}{review.id}/comments/',
+        ]
+        responses = send_all(application, paths)
+        for path, (status, body) in zip(paths, responses):
+            expected = client.get(path, HTTP_ACCEPT='application/json')
+            assert status == expected.status_code == 200
+            assert body == expected.content, (
+                f'Check that `{path}` is answered like through WSGI')
+        assert len(served) == len(paths), (
+            'Check that anonymous catalogue reads use the thread pool')
+        application.executor.shutdown()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_other_requests_use_wsgi(self):
+        titles, reviews = create_content()
+        review = reviews[-1]
+        application = CatalogueApplication(WSGIHandler(), workers=2)
+        forwarded = []
+
+        async def fallback(scope, receive, send):
+            forwarded.append((scope['method'], scope['path']))
+
+        application.fallback = fallback
+        prefix = f'/api/v1/titles/{titles[0].id}/reviews/'
+
+        async def main():
+            scopes = [
+                {'method': 'POST', 'path': '/api/v1/titles/'},
+                {'method': 'GET', 'path': '/api/v1/users/'},
+                {'method': 'GET', 'path': f'{prefix}{review.id}/'},
+                {'method': 'GET', 'path': '/api/v1/missing/'},
+                {'method': 'GET', 'path': '/api/v1/titles/',
+                 'headers': [(b'authorization', b'Bearer token')]},
+            ]
+            for scope in scopes:
+                scope = {'type': 'http', 'query_string': b'',
+                         'headers': [], **scope}
+                await application(scope, None, None)
+
+        asyncio.run(main())
+        assert forwarded == [
+            ('POST', '/api/v1/titles/'),
+            ('GET', '/api/v1/users/'),
+            ('GET', f'{prefix}{review.id}/'),
+            ('GET', '/api/v1/missing/'),
+            ('GET', '/api/v1/titles/'),
+        ]
+        application.executor.shutdown()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_identical_requests_coalesced(self):
+        create_content()
+        application = CatalogueApplication(WSGIHandler(), workers=4)
+        calls = []
+        release = threading.Event()
+        get_response = application.get_response
+
+        def slow_get_response(scope):
+            calls.append(scope['query_string'])
+            release.wait(5)
+            return get_response(scope)
+
+        application.get_response = slow_get_response
+
+        async def main():
+            paths = ['/api/v1/titles/'] * 10 + ['/api/v1/titles/?limit=1'] * 5
+            tasks = [asyncio.ensure_future(request(application, path))
+                     for path in paths]
+            while len(calls) < 2:
+                await asyncio.sleep(0.01)
+            release.set()
+            return await asyncio.gather(*tasks)
+
+        responses = asyncio.run(main())
+        assert sorted(calls) == [b'', b'limit=1']
+        assert {status for status, _ in responses} == {200}
+        assert len({body for _, body in responses[:10]}) == 1
+        assert application.in_flight == {}
+        application.executor.shutdown()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_load_test(self):
+        create_content()
+        handler = WSGIHandler()
+        paths = catalogue_paths()
+        requests = request_paths(paths, 40)
+        application = CatalogueApplication(handler, workers=2)
+        result = asyncio.run(run_load(application, requests, 5))
+        assert result['requests'] == 40
+        assert result['errors'] == 0
+        assert result['requests_per_second'] > 0
+        application.executor.shutdown()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_fallback_requests(self, token_admin, admin_client):
+        create_content()
+        token = f'Bearer {token_admin["access"]}'.encode()
+        application = CatalogueApplication(WSGIHandler(), workers=2)
+
+        async def call(method, path, body=b''):
+            chunks = [body[:5], body[5:]]
+            messages = []
+
+            async def receive():
+                chunk = chunks.pop(0)
+                return {'type': 'http.request', 'body': chunk,
+                        'more_body': bool(chunks)}
+
+            async def send(message):
+                messages.append(message)
+
+            scope = {**http_scope(path), 'method': method}
+            scope['headers'] = scope['headers'] + [
+                (b'authorization', token),
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode())]
+            await application(scope, receive, send)
+            assert not messages[-1].get('more_body')
+            return messages[0]['status'], b''.join(
+                message.get('body', b'') for message in messages[1:])
+
+        status, body = asyncio.run(call(
+            'POST', '/api/v1/categories/',
+            json.dumps({'name': 'Опера', 'slug': 'opera'}).encode()))
+        assert status == 201, (
+            'Check that the body of a request reaches the WSGI handler')
+        assert json.loads(body) == {'name': 'Опера', 'slug': 'opera'}
+        status, body = asyncio.run(call('GET', '/api/v1/export/titles/'))
+        expected = admin_client.get('/api/v1/export/titles/')
+        assert status == 200
+        assert body == b''.join(expected.streaming_content), (
+            'Check that a streaming response is sent whole')
+        application.executor.shutdown()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_fallback_requests_concurrent(self):
+        create_content()
+        application = CatalogueApplication(WSGIHandler(), workers=2)
+        both_running = threading.Barrier(2, timeout=5)
+        threads = set()
+        handle = application.handle
+
+        def concurrent_handle(scope, body=b''):
+            threads.add(threading.get_ident())
+            both_running.wait()
+            return handle(scope, body)
+
+        application.handle = concurrent_handle
+
+        async def main():
+            return await asyncio.gather(
+                request(application, '/api/v1/users/'),
+                request(application, '/api/v1/users/me/'))
+
+        responses = asyncio.run(main())
+        assert len(threads) == 2, (
+            'Check that requests which are not catalogue reads '
+            'do not wait for each other')
+        assert [status for status, _ in responses] == [401, 401]
+        application.executor.shutdown()
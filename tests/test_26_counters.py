@@ -0,0 +1,178 @@
+import pytest
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+
+from .common import create_content
+
+
+def create_discussion():
+    # Titles with 3, 1 and 2 reviews, the reviews of the first title
+    # have 3, 1 and 2 comments.
+    return create_content(review_counts=(3, 1, 2), comment_counts=(3, 1, 2))
+
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return ' '.join(str(row) for row in cursor.fetchall())
+
+
+class Test26Counters:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_counters_follow_changes(self):
+        from reviews.models import Comment, Review, Title, User
+
+        titles, reviews = create_discussion()
+
+        def counts():
+            return (
+                list(Title.objects.order_by('id').values_list(
+                    'review_count', flat=True)),
+                list(Review.objects.filter(title=titles[0]).order_by(
+                    'id').values_list('comment_count', flat=True)))
+
+        assert counts() == ([3, 1, 2], [3, 1, 2]), (
+            'Check that creating reviews and comments updates the counters'
+        )
+        Comment.objects.filter(author__username='reader0').first().delete()
+        assert counts()[1] == [2, 1, 2]
+        User.objects.get(username='reader1').delete()
+        assert counts() == ([2, 1, 1], [1, 1]), (
+            'Check that cascaded deletes update the counters'
+        )
+        Review.objects.filter(title=titles[0]).first().delete()
+        assert counts() == ([1, 1, 1], [1])
+        review = Review.objects.get(title=titles[0])
+        review.comments.all().delete()
+        assert counts()[1] == [0]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_stale_review_keeps_count(self):
+        from reviews.models import Comment, Review
+
+        titles, reviews = create_discussion()
+        review = reviews[1]
+        Comment.objects.create(
+            review=review, author=review.author, text='Late')
+        review.text = 'Edited'
+        review.save()
+        review = Review.objects.get(pk=review.pk)
+        assert (review.text, review.comment_count) == ('Edited', 2), (
+            'Check that saving a stale review keeps its comment count'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_bumps_review_updated(self):
+        from reviews.models import Comment, Review
+
+        titles, reviews = create_discussion()
+        review = reviews[3]
+        updated = Review.objects.get(pk=review.pk).updated
+        Comment.objects.create(
+            review=review, author=review.author, text='New')
+        assert Review.objects.get(pk=review.pk).updated > updated, (
+            'Check that a new comment changes the `updated` of the review'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_ordering(self, client, settings):
+        titles, reviews = create_discussion()
+        response = client.get('/api/v1/titles/?ordering=-review_count')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [title['id'] for title in results] == [
+            titles[0].id, titles[2].id, titles[1].id], (
+            'Check that `?ordering=-review_count` puts the most reviewed '
+            'titles first'
+        )
+        assert [title['review_count'] for title in results] == [3, 2, 1]
+        response = client.get('/api/v1/titles/?ordering=review_count')
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[1].id, titles[2].id, titles[0].id]
+        prefix = f'/api/v1/titles/{titles[0].id}/reviews/'
+        response = client.get(f'{prefix}?ordering=-comment_count')
+        assert [(review['author'], review['comment_count'])
+                for review in response.json()['results']] == [
+            ('reader0', 3), ('reader2', 2), ('reader1', 1)], (
+            'Check that `?ordering=-comment_count` puts the most discussed '
+            'reviews first'
+        )
+        for url in ('/api/v1/titles/?ordering=-review_count',
+                    f'/api/v1/titles/{titles[0].id}/',
+                    f'{prefix}?ordering=-comment_count',
+                    f'{prefix}{reviews[0].id}/'):
+            settings.FAST_READ_PATH = True
+            fast = client.get(url)
+            settings.FAST_READ_PATH = False
+            slow = client.get(url)
+            assert fast.content == JSONRenderer().render(
+                slow.data, 'application/json', {}), (
+                f'Check that `{url}` renders the same bytes on the fast path'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_rebuild(self):
+        from reviews.bulk import refresh_derived_data
+        from reviews.models import Review, Title
+
+        titles, reviews = create_discussion()
+        Title.objects.update(review_count=0)
+        Review.objects.update(comment_count=7)
+        refresh_derived_data()
+        assert Title.objects.get(pk=titles[0].pk).review_count == 3
+        assert sorted(Review.objects.values_list(
+            'comment_count', flat=True)) == [0, 0, 0, 1, 2, 3]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_index_scan(self):
+        from reviews.models import Review, Title
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('The query plan is checked on SQLite only')
+        plan = explain(Title.objects.order_by('-review_count', '-id'))
+        assert 'title_review_count_idx' in plan
+        assert 'TEMP B-TREE' not in plan
+        plan = explain(Review.objects.filter(title_id=1).order_by(
+            '-comment_count', '-id'))
+        assert 'review_title_comments_idx' in plan
+        assert 'TEMP B-TREE' not in plan, (
+            'Check that the most discussed reviews are read in index order'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_ordering_with_cursor(self, client):
+        from reviews.models import Title
+
+        titles, reviews = create_discussion()
+        for name in ('Unrated', 'Unrated too'):
+            Title.objects.create(name=name, year=2000, description='Text')
+        prefix = f'/api/v1/titles/{titles[0].id}/reviews/'
+        for url in ('/api/v1/titles/?ordering=-review_count',
+                    '/api/v1/titles/?ordering=review_count',
+                    '/api/v1/titles/?ordering=rating',
+                    '/api/v1/titles/?ordering=-rating',
+                    f'{prefix}?ordering=pub_date',
+                    f'{prefix}?ordering=-comment_count'):
+            expected = [item['id'] for item in
+                        client.get(f'{url}&limit=100').json()['results']]
+            ids = []
+            response = client.get(f'{url}&cursor=&limit=1')
+            while True:
+                assert response.status_code == 200
+                data = response.json()
+                ids.extend(item['id'] for item in data['results'])
+                if not data['next']:
+                    break
+                response = client.get(data['next'])
+            assert ids == expected, (
+                f'Check that cursor pages of `{url}` keep the ordering'
+            )
+            back = []
+            while data['previous']:
+                data = client.get(data['previous']).json()
+                back[:0] = [item['id'] for item in data['results']]
+            assert back == expected[:-1], (
+                f'Check that the previous links of `{url}` walk back'
+            )
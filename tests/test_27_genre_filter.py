@@ -0,0 +1,95 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def create_catalogue():
+    from reviews.models import Genre, Title
+
+    genres = {slug: Genre.objects.create(name=slug.title(), slug=slug)
+              for slug in ('drama', 'comedy', 'horror')}
+    for name, year, slugs in (
+            ('Both', 1995, ['drama', 'comedy']),
+            ('All three', 2005, ['drama', 'comedy', 'horror']),
+            ('Drama only', 2010, ['drama']),
+            ('Comedy only', 1980, ['comedy']),
+            ('No genre', 2000, [])):
+        title = Title.objects.create(
+            name=name, year=year, description='Text')
+        title.genre.set([genres[slug] for slug in slugs])
+
+
+def names(client, query):
+    response = client.get(f'/api/v1/titles/?limit=100&{query}')
+    assert response.status_code == 200, query
+    return sorted(title['name'] for title in response.json()['results'])
+
+
+class Test27GenreFilter:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_genre_modes(self, client):
+        create_catalogue()
+        assert names(client, 'genre=drama') == [
+            'All three', 'Both', 'Drama only']
+        assert names(client, 'genre=drama,comedy') == [
+            'All three', 'Both', 'Comedy only', 'Drama only'], (
+            'Check that several genres match titles of any of them'
+        )
+        assert names(client, 'genre=drama,comedy&genre_mode=any') == names(
+            client, 'genre=drama,comedy')
+        assert names(client, 'genre=drama,comedy&genre_mode=all') == [
+            'All three', 'Both'], (
+            'Check that `genre_mode=all` matches titles of all the genres'
+        )
+        assert names(
+            client, 'genre=drama, comedy ,horror&genre_mode=all') == [
+            'All three']
+        assert names(client, 'genre=drama,missing') == [
+            'All three', 'Both', 'Drama only']
+        assert names(client, 'genre=drama,missing&genre_mode=all') == []
+        assert names(client, 'genre=drama,drama&genre_mode=all') == [
+            'All three', 'Both', 'Drama only']
+        response = client.get('/api/v1/titles/?genre=drama&genre_mode=some')
+        assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_year_range(self, client):
+        create_catalogue()
+        assert names(client, 'year_min=2000') == [
+            'All three', 'Drama only', 'No genre']
+        assert names(client, 'year_max=1995') == ['Both', 'Comedy only']
+        assert names(client, 'year_min=1990&year_max=2005') == [
+            'All three', 'Both', 'No genre']
+        assert names(
+            client, 'genre=comedy,drama&genre_mode=all&year_max=2000') == [
+            'Both']
+        response = client.get('/api/v1/titles/?year_min=recent')
+        assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_single_semi_join(self, client):
+        create_catalogue()
+        with CaptureQueriesContext(connection) as queries:
+            client.get('/api/v1/titles/?genre=drama,comedy&genre_mode=all')
+        count_sql = queries.captured_queries[0]['sql']
+        assert count_sql.count('reviews_title_genre') == 1
+        assert 'GROUP BY' in count_sql and 'DISTINCT' not in count_sql, (
+            'Check that `genre_mode=all` is one grouped semi-join'
+        )
+        assert len(queries.captured_queries) == 4
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_year_index(self):
+        from reviews.models import Title
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('The query plan is checked on SQLite only')
+        sql, params = Title.objects.filter(
+            year__gte=1990, year__lte=2000).query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        assert 'reviews_title_year' in plan, (
+            'Check that year ranges are read from the year index'
+        )
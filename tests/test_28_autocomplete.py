@@ -0,0 +1,192 @@
+import threading
+import time
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+def create_titles():
+    from reviews.models import Title
+
+    return {name: Title.objects.create(name=name, year=year,
+                                       description='Text')
+            for name, year in (('Star Wars', 1977), ('Stargate', 1994),
+                               ('star  Trek', 1979), ('Stalker', 1979),
+                               ('Solaris', 1972), ('Starship Troopers', 1997))}
+
+
+def suggest(client, query):
+    response = client.get(f'/api/v1/titles/autocomplete/?{query}')
+    assert response.status_code == 200
+    return response.json()
+
+
+class Test28Autocomplete:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_prefix_matches(self, client):
+        titles = create_titles()
+        assert suggest(client, 'q=sta') == [
+            {'id': titles[name].id, 'name': name, 'year': titles[name].year}
+            for name in ('Stalker', 'star  Trek', 'Star Wars', 'Stargate',
+                         'Starship Troopers')
+        ], (
+            'Check that `/api/v1/titles/autocomplete/` returns the id, name '
+            'and year of titles starting with `q`'
+        )
+        names = [title['name'] for title in suggest(client, 'q=STAR')]
+        assert names == ['star  Trek', 'Star Wars', 'Stargate',
+                         'Starship Troopers'], (
+            'Check that suggestions ignore case and are sorted by name'
+        )
+        assert [title['name'] for title in suggest(
+            client, 'q=star%20%20t')] == ['star  Trek']
+        assert len(suggest(client, 'q=s&limit=2')) == 2
+        assert suggest(client, 'q=') == []
+        assert suggest(client, 'q=zz') == []
+        response = client.get('/api/v1/titles/autocomplete/?q=s&limit=x')
+        assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_follows_changes(self, client, admin_client):
+        from reviews.models import Category, Genre, Title
+
+        titles = create_titles()
+        suggest(client, 'q=s')
+        title = titles['Stalker']
+        title.name = 'Zerkalo'
+        title.save()
+        titles['Solaris'].delete()
+        Title.objects.create(name='Stand by Me', year=1986,
+                             description='Text')
+        Category.objects.create(name='Films', slug='films')
+        Genre.objects.create(name='Drama', slug='drama')
+        response = admin_client.post('/api/v1/titles/bulk/', [
+            {'name': 'Stagecoach', 'year': 1939, 'description': 'Text',
+             'category': 'films', 'genre': ['drama']}], format='json')
+        assert response.status_code == 201, response.json()
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                Title.objects.create(name='Stay', year=2005,
+                                     description='Text')
+                raise RuntimeError
+        names = [title['name'] for title in suggest(client, 'q=sta')]
+        assert names == ['Stagecoach', 'Stand by Me', 'star  Trek',
+                         'Star Wars', 'Stargate', 'Starship Troopers'], (
+            'Check that suggestions follow committed title changes'
+        )
+        assert suggest(client, 'q=zer')[0]['id'] == title.id
+        assert suggest(client, 'q=sol') == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_catch_up_after_external_change(self, client):
+        from django.utils import timezone
+
+        from api import autocomplete, cache
+        from reviews.models import Title
+
+        create_titles()
+        suggest(client, 'q=s')
+        Title.objects.filter(name='Solaris').update(
+            name='Nostalghia', updated=timezone.now())
+        assert suggest(client, 'q=nos') == []
+        cache.invalidate(autocomplete.CACHE_PREFIX)
+        with CaptureQueriesContext(connection) as queries:
+            names = [title['name'] for title in suggest(client, 'q=nos')]
+        assert names == ['Nostalghia'], (
+            'Check that the index catches up when another process changed '
+            'titles'
+        )
+        assert len(queries.captured_queries) == 1
+        assert '"updated" >=' in queries.captured_queries[0]['sql'], (
+            'Check that the index only reads the titles changed since '
+            'the last check instead of reloading all of them'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_max_age(self, client, settings):
+        from django.utils import timezone
+
+        from api import autocomplete
+        from reviews.models import Title
+
+        titles = create_titles()
+        suggest(client, 'q=s')
+        Title.objects.filter(name='Solaris').update(
+            name='Nostalghia', updated=timezone.now())
+        assert suggest(client, 'q=nos') == []
+        settings.AUTOCOMPLETE_MAX_AGE = 0
+        assert [title['name'] for title in suggest(client, 'q=nos')] == [
+            'Nostalghia'], (
+            'Check that the index is checked for changes of other processes '
+            'after `AUTOCOMPLETE_MAX_AGE` without a shared cache'
+        )
+        # The index of another process sharing the cache.
+        index = autocomplete.TitlePrefixIndex()
+        assert [title['name'] for title in index.search('stal', 10)] == [
+            'Stalker']
+        titles['Stalker'].delete()
+        with CaptureQueriesContext(connection) as queries:
+            assert index.search('stal', 10) == [], (
+                'Check that titles deleted by other processes are removed'
+            )
+        assert 'COUNT' not in queries.captured_queries[0]['sql']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_no_queries(self, client):
+        create_titles()
+        suggest(client, 'q=s')
+        with CaptureQueriesContext(connection) as queries:
+            suggest(client, 'q=star')
+        assert len(queries.captured_queries) == 0, (
+            'Check that suggestions are served from memory'
+        )
+
+    def test_06_lookup_time(self):
+        from api import autocomplete, cache
+
+        index = autocomplete.TitlePrefixIndex()
+        words = ['alpha', 'beta', 'gamma', 'delta', 'omega', 'sigma']
+        index.titles = {
+            pk: (f'{words[pk % 6]} {words[pk // 6 % 6]} {pk}', 2000)
+            for pk in range(200000)}
+        index.entries = sorted(
+            (autocomplete.normalize(name), pk)
+            for pk, (name, _) in index.titles.items())
+        index.deleted = cache.get_version(autocomplete.DELETED_PREFIX)
+        index.mark_synced(cache.get_version(autocomplete.CACHE_PREFIX), None)
+        started = time.perf_counter()
+        for _ in range(1000):
+            matches = index.search('Gamma Del', 10)
+        elapsed = (time.perf_counter() - started) / 1000
+        assert len(matches) == 10
+        assert elapsed < 0.001, (
+            'Check that a lookup takes less than a millisecond'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_searches_during_reload(self):
+        from api import autocomplete
+
+        titles = create_titles()
+        index = autocomplete.TitlePrefixIndex()
+        solaris = index.search('so', 10)
+        assert [title['name'] for title in solaris] == ['Solaris']
+        titles['Solaris'].delete()
+        during = []
+
+        def search_meanwhile(execute, sql, params, many, context):
+            if not during:
+                thread = threading.Thread(
+                    target=lambda: during.append(index.search('so', 10)))
+                thread.start()
+                thread.join(5)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(search_meanwhile):
+            assert index.search('so', 10) == []
+        assert during == [solaris], (
+            'Check that searches keep using the current titles while '
+            'the index is reloaded'
+        )
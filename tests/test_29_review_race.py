@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+from django.db import connection
+
+from .common import auth_client
+
+PARALLEL_REQUESTS = 4
+
+
+class Test29ReviewRace:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_parallel_reviews(self, user, monkeypatch):
+        from api.views import ReviewViewSet
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Film', year=2000,
+                                     description='Text')
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        # Every request is validated before any review is saved. The
+        # inserts run one at a time: the shared in-memory test database
+        # fails concurrent writers instead of making them wait.
+        barrier = threading.Barrier(PARALLEL_REQUESTS, timeout=10)
+        insert_lock = threading.Lock()
+        perform_create = ReviewViewSet.perform_create
+
+        def perform_create_together(self, serializer):
+            barrier.wait()
+            with insert_lock:
+                perform_create(self, serializer)
+
+        monkeypatch.setattr(
+            ReviewViewSet, 'perform_create', perform_create_together)
+        responses = []
+
+        def post(client, score):
+            try:
+                responses.append(client.post(
+                    url, data={'text': 'Text', 'score': score}))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=post, args=(auth_client(user), n))
+                   for n in range(1, PARALLEL_REQUESTS + 1)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        statuses = sorted(response.status_code for response in responses)
+        assert statuses == [201] + [400] * (PARALLEL_REQUESTS - 1), (
+            'Check that parallel reviews of one author and title create '
+            'one review and are answered with 400 otherwise'
+        )
+        for response in responses:
+            if response.status_code == 400:
+                assert response.json() == {
+                    'non_field_errors': ['Re-comment']}
+        title.refresh_from_db()
+        assert Review.objects.filter(title=title).count() == 1
+        assert title.review_count == 1, (
+            'Check that failed inserts leave the title rating unchanged'
+        )